@@ -0,0 +1,17 @@
+# _njit.py
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    import warnings
+    # numba가 없으면 같은 코드를 파이썬으로 실행 (결과는 같고 속도만 느림)
+    NUMBA_AVAILABLE = False
+    warnings.warn("numba가 설치되어 있지 않아 백테스트 루프를 파이썬으로 실행합니다. (requirements.txt의 numba 설치 권장)", RuntimeWarning)
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs: return args[0]
+        return lambda func: func
+
+    # parallel=True 커널의 prange는 일반 range로 순서대로 실행
+    prange = range
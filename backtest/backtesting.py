@@ -1,125 +1,285 @@
+import functools
+import itertools
+import multiprocessing
+import numpy as np
+import os
 import pandas as pd
-import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from . import invest_strategy
+from . import storage
+from ._njit import njit
 
-def backtest(strategy_function, strategy_param, resample_period='h', window_size=pd.DateOffset(months=6), step_size=pd.DateOffset(days=1), progress_callback=None, plot_callback=None, initial_cash=100, fee_rate=0.001):
+DATA_FILE = 'backtest/data.csv'
+
+
+@functools.lru_cache(maxsize=1)
+def _load_minute_bars(path, mtime):
+    return storage.read_minute_bars(path)
+
+@functools.lru_cache(maxsize=8)
+def _load_resampled_cached(path, mtime, resample_period):
+    # 1시간/4시간/1일봉은 update_data가 미리 저장해 둔 파일을 바로 사용
+    df = storage.read_resampled(path, resample_period)
+    if df is not None: return df
+    return storage.resample_ohlcv(_load_minute_bars(path, mtime), resample_period)
+
+def _load_resampled(path, resample_period):
+    """리샘플링된 데이터를 캐시에서 반환 (파일 수정 시각이 바뀌면 다시 읽음)"""
+    # 반환된 데이터프레임은 캐시와 공유되므로 호출부에서 직접 수정하면 안 됨
+    return _load_resampled_cached(path, os.path.getmtime(path), resample_period)
+
+def load_data(resample_period='h', path=DATA_FILE):
+    """백테스트용 리샘플링 데이터를 불러옴 (결과를 df_resampled 인자로 넘기면 여러 번의 백테스트에서 재사용)"""
+    return _load_resampled(path, resample_period)
+
+_FIXED_OFFSET_KEYS = {'weeks', 'days', 'hours', 'minutes', 'seconds', 'milliseconds', 'microseconds', 'nanoseconds'}
+
+def _as_timedelta(offset):
+    """일/주/시간 단위처럼 길이가 고정된 오프셋을 Timedelta로 변환 (월/연 단위면 None)"""
+    if isinstance(offset, pd.Timedelta): return offset
+    if isinstance(offset, pd.offsets.Tick): return pd.Timedelta(offset)
+    kwds = getattr(offset, 'kwds', None)
+    if kwds and set(kwds) <= _FIXED_OFFSET_KEYS: return pd.Timedelta(**kwds) * offset.n
+    return None
+
+@functools.lru_cache(maxsize=64)
+def _count_windows(start_date, end_date, window_size, step_size):
+    """롤링 윈도우 개수 (진행률 표시용)"""
+    step = _as_timedelta(step_size)
+    if step is None or step <= pd.Timedelta(0):
+        # 월 단위 간격: 시작 시점들을 한 번에 생성해서 셈
+        starts = pd.date_range(start_date, end_date, freq=step_size)
+        return int((starts + window_size <= end_date).sum())
+    if start_date + window_size > end_date: return 0
+    # 고정 간격: (마지막 시작 시점 - 첫 시작 시점) // 간격 + 1
+    # 윈도우가 월 단위면 말일 보정 때문에 경계에서 한 칸 어긋날 수 있어 확인 후 조정
+    total_steps = (end_date - window_size - start_date) // step + 1
+    while total_steps > 0 and start_date + (total_steps - 1) * step + window_size > end_date: total_steps -= 1
+    while start_date + total_steps * step + window_size <= end_date: total_steps += 1
+    return int(total_steps)
+
+
+_worker_df, _worker_shm = None, None
+
+def _share_frame(df):
+    """
+    float64 컬럼만 있는 데이터프레임을 공유 메모리에 복사하고, 작업 프로세스에서 복사 없이 다시 만들 때 쓸 정보를 반환
+    - 컬럼마다 값이 연속으로 놓이도록 열 우선(F) 순서로 저장 (반환된 공유 메모리는 호출부에서 close/unlink)
+    """
+    shm = shared_memory.SharedMemory(create=True, size=max(df.size * 8, 1))
+    np.ndarray(df.shape, dtype=np.float64, buffer=shm.buf, order='F')[:] = df.to_numpy(dtype=np.float64)
+    return shm, (shm.name, df.shape, df.index, df.columns)
+
+def _init_worker(df, shared=None):
+    """작업 프로세스마다 한 번만 데이터를 전달받아 보관 (shared가 있으면 공유 메모리 위에 데이터프레임을 만듦)"""
+    global _worker_df, _worker_shm
+    if shared is not None:
+        name, shape, index, columns = shared
+        _worker_shm = shared_memory.SharedMemory(name=name)
+        df = pd.DataFrame(np.ndarray(shape, dtype=np.float64, buffer=_worker_shm.buf, order='F'), index=index, columns=columns, copy=False)
+    _worker_df = df
+
+def _evaluate_window(df, task):
+    """윈도우 하나에 전략을 실행하고 결과를 반환"""
+    strategy_function, strategy_param, i0, i1, initial_cash, fee_rate, leverage = task
+    # 기본 전략들은 입력 데이터프레임을 수정하지 않지만, 컬럼을 추가하는 전략도 있을 수 있어 얕은 복사로 넘김 (데이터 복사 없음)
+    result = strategy_function(strategy_param, df.iloc[i0:i1].copy(deep=False), initial_cash, fee_rate, leverage=leverage)
+    result.pop('asset_history', None) # 롤링 집계에는 필요 없으므로 프로세스 간 전송량을 줄임
+    return result
+
+def _evaluate_window_in_worker(task):
+    return _evaluate_window(_worker_df, task)
+
+def _rolling_windows(df_resampled, window_size, step_size, task_args, max_workers=None):
+    """
+    롤링 윈도우마다 전략을 실행해 (시작, 끝, 전략 결과, 시장 수익률 %)를 순서대로 반환합니다.
+    - 각 윈도우는 서로 독립적이므로 프로세스 풀로 나눠서 실행합니다. (max_workers=1이면 현재 프로세스에서 실행)
+    """
+    start_date, end_date = df_resampled.index[0], df_resampled.index[-1]
+    step, window = _as_timedelta(step_size), _as_timedelta(window_size)
+    if step is not None and step > pd.Timedelta(0):
+        # 일/주 단위 간격은 Timedelta로 시작 시점들을 한 번에 생성 (DateOffset 덧셈을 반복하지 않음)
+        starts = start_date + step * np.arange(_count_windows(start_date, end_date, window_size, step_size))
+        ends = starts + (window if window is not None else window_size)
+    else:
+        # 월 단위 간격은 달력 규칙(말일 등)을 따라야 하므로 DateOffset으로 하나씩 계산
+        starts, ends, current_start = [], [], start_date
+        while current_start + window_size <= end_date:
+            starts.append(current_start); ends.append(current_start + window_size)
+            current_start += step_size
+        starts, ends = pd.DatetimeIndex(starts), pd.DatetimeIndex(ends)
+    if len(starts) == 0: return
+
+    # 모든 윈도우의 경계 위치와 시장 수익률을 한 번에 계산 (구간은 .loc와 동일하게 양 끝 포함)
+    index, close = df_resampled.index, df_resampled['Close'].to_numpy()
+    i0s, i1s = index.searchsorted(starts), index.searchsorted(ends, side='right')
+    valid = np.flatnonzero(i1s - i0s >= 20)
+    market_returns = ((close[i1s[valid] - 1] / close[i0s[valid]]) - 1) * 100
+    spans = [(starts[k], ends[k]) for k in valid]
+    tasks = [task_args[:2] + (int(i0s[k]), int(i1s[k])) + task_args[2:] for k in valid]
+
+    results = _map_tasks(df_resampled, tasks, max_workers)
+    yield from ((s, e, r, m) for (s, e), r, m in zip(spans, results, market_returns))
+
+def _map_tasks(df, tasks, max_workers=None):
+    """
+    작업마다 전략을 실행해 결과를 작업 순서대로 반환합니다.
+    - 작업은 서로 독립적이므로 프로세스 풀로 나눠서 실행합니다. (max_workers=1이면 현재 프로세스에서 실행)
+    """
+    max_workers = min(max_workers or os.cpu_count() or 1, len(tasks))
+    if max_workers <= 1:
+        yield from (_evaluate_window(df, t) for t in tasks); return
+    # njit 커널을 먼저 컴파일해 디스크 캐시에 저장 (작업 프로세스마다 다시 컴파일하지 않고 캐시만 불러옴)
+    invest_strategy.warmup_kernels()
+    # 가격 데이터는 공유 메모리에 한 번만 복사하고 작업 프로세스들은 그 메모리를 그대로 읽음 (프로세스마다 데이터를 pickle로 받지 않음)
+    shm, shared = _share_frame(df) if (df.dtypes == np.float64).all() else (None, None)
+    initargs = (None, shared) if shared is not None else (df,)
+    try:
+        # Qt 스레드에서 호출되므로 fork 대신 spawn 사용, 데이터는 initializer로 프로세스당 한 번만 전달
+        with ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_worker, initargs=initargs) as ex:
+            chunksize = max(1, len(tasks) // (max_workers * 8))
+            yield from ex.map(_evaluate_window_in_worker, tasks, chunksize=chunksize)
+    finally:
+        if shm is not None: shm.close(); shm.unlink()
+
+def param_grid(grid):
+    """
+    파라미터별 후보 값 목록({'short_ma': [10, 20], 'long_ma': [50, 100]})의 모든 조합을 파라미터 딕셔너리 리스트로 만듭니다.
+    - 앞쪽 파라미터가 같은 조합끼리 이어지므로, 같은 지표를 쓰는 조합이 연달아 실행되어 지표 캐시를 재사용합니다.
+    """
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+def run_backtests_parallel(strategy_function, param_list, df, initial_cash=100, fee_rate=0.001, leverage=1, max_workers=None, progress_callback=None):
+    """
+    같은 데이터에 여러 파라미터 조합으로 전략을 실행합니다. (파라미터 탐색용, 조합은 param_grid로 만들 수 있음)
+    - 조합마다 독립적이므로 프로세스 풀로 나눠서 실행하고, 결과는 param_list 순서대로 리스트로 반환합니다.
+    - 결과에는 asset_history가 포함되지 않습니다.
+    """
+    tasks = [(strategy_function, param, 0, len(df), initial_cash, fee_rate, leverage) for param in param_list]
+    results = []
+    for result in _map_tasks(df, tasks, max_workers):
+        results.append(result)
+        if progress_callback: progress_callback(len(results), len(tasks))
+    return results
+
+
+def backtest(strategy_function, strategy_param, resample_period='h', window_size=pd.DateOffset(months=6), step_size=pd.DateOffset(days=1), progress_callback=None, plot_callback=None, initial_cash=100, fee_rate=0.001, max_workers=None, df_resampled=None, return_windows=False):
     """롤링 윈도우 백테스팅 (일반)"""
     print("롤링 윈도우 백테스팅을 시작합니다.")
     try:
-        df = pd.read_csv('backtest/data.csv', parse_dates=['Open time'], index_col='Open time')
-        df_resampled = df.resample(resample_period).agg({
-            'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'
-        }).dropna()
+        # 미리 불러온 데이터가 있으면 그대로 사용 (여러 전략을 연달아 돌릴 때 로딩을 한 번만 하도록)
+        if df_resampled is None: df_resampled = _load_resampled(DATA_FILE, resample_period)
         print(f"데이터 준비 완료 ({resample_period} 봉)")
     except FileNotFoundError:
         print("데이터 파일을 찾을 수 없습니다."); return None
 
-    start_date, end_date = df_resampled.index[0], df_resampled.index[-1]
-    current_start = start_date
-    all_results, total_steps, current_step = [], 0, 0
-
-    temp_start = start_date
-    while temp_start + window_size <= end_date:
-        total_steps += 1; temp_start += step_size
+    total_steps = _count_windows(df_resampled.index[0], df_resampled.index[-1], window_size, step_size)
+    task_args = (strategy_function, strategy_param, initial_cash, fee_rate, 1)
+    # 윈도우별 결과를 담을 배열을 미리 할당 (total_steps는 실제 실행되는 윈도우 수의 상한)
+    strategy_returns, market_returns, strategy_mdds = np.empty(total_steps), np.empty(total_steps), np.empty(total_steps)
+    total_trades, current_step, window_starts = np.empty(total_steps, dtype=np.int64), 0, []
 
-    while current_start + window_size <= end_date:
-        current_end = current_start + window_size
-        window_df = df_resampled.loc[current_start:current_end]
-        if len(window_df) < 20: current_start += step_size; continue
-        
-        window_strategy_result = strategy_function(strategy_param, window_df.copy(), initial_cash, fee_rate, leverage=1)
-        market_return = (window_df['Close'].iloc[-1] / window_df['Close'].iloc[0]) - 1
-
-        all_results.append({
-            'start_date': current_start, 'end_date': current_end,
-            'strategy_return': window_strategy_result['total_return_pct'],
-            'market_return': market_return * 100,
-            'strategy_mdd': window_strategy_result['mdd_pct'],
-            'total_trades': window_strategy_result['total_trades']
-        })
-        current_start += step_size; current_step += 1
+    for current_start, current_end, window_strategy_result, market_return in _rolling_windows(df_resampled, window_size, step_size, task_args, max_workers):
+        strategy_returns[current_step], market_returns[current_step] = window_strategy_result['total_return_pct'], market_return
+        strategy_mdds[current_step], total_trades[current_step] = window_strategy_result['mdd_pct'], window_strategy_result['total_trades']
+        current_step += 1
         if progress_callback: progress_callback(current_step, total_steps)
-        if plot_callback: plot_callback(current_start, window_strategy_result['total_return_pct'], market_return * 100)
+        if plot_callback: plot_callback(current_start + step_size, window_strategy_result['total_return_pct'], market_return)
+        if return_windows: window_starts.append(current_start)
     
-    if not all_results: print("백테스팅을 실행할 기간이 충분하지 않습니다."); return None
+    if current_step == 0: print("백테스팅을 실행할 기간이 충분하지 않습니다."); return None
     
-    results_df = pd.DataFrame(all_results)
-    avg_return = results_df['strategy_return'].mean()
+    strategy_returns, market_returns = strategy_returns[:current_step], market_returns[:current_step]
+    avg_return = np.nanmean(strategy_returns)
     final_balance = initial_cash * (1 + avg_return / 100)
-    return {
+    results = {
         'final_balance': final_balance, 'total_return_pct': avg_return,
-        'mdd_pct': results_df['strategy_mdd'].mean(),
-        'win_rate_pct': (results_df['strategy_return'] > results_df['market_return']).mean() * 100,
-        'total_trades': results_df['total_trades'].sum()
+        'mdd_pct': np.nanmean(strategy_mdds[:current_step]),
+        'win_rate_pct': (strategy_returns > market_returns).mean() * 100,
+        'total_trades': total_trades[:current_step].sum()
     }
+    if return_windows:
+        # 윈도우별 상세 결과는 요청한 경우에만 데이터프레임으로 만들어 반환
+        results['windows'] = pd.DataFrame({
+            'strategy_return': strategy_returns, 'market_return': market_returns,
+            'strategy_mdd': strategy_mdds[:current_step], 'total_trades': total_trades[:current_step]
+        }, index=pd.DatetimeIndex(window_starts, name='start_date'))
+    return results
 
 
-def leverage_backtest(strategy_function, strategy_param, leverage, resample_period='h', window_size=pd.DateOffset(months=6), step_size=pd.DateOffset(days=1), progress_callback=None, plot_callback=None, initial_cash=100, fee_rate=0.001):
+def leverage_backtest(strategy_function, strategy_param, leverage, resample_period='h', window_size=pd.DateOffset(months=6), step_size=pd.DateOffset(days=1), progress_callback=None, plot_callback=None, initial_cash=100, fee_rate=0.001, max_workers=None, df_resampled=None, return_windows=False):
     """롤링 윈도우 백테스팅 (레버리지)"""
     print(f"롤링 레버리지 백테스팅을 시작합니다. (레버리지: {leverage}x)")
     try:
-        df = pd.read_csv('backtest/data.csv', parse_dates=['Open time'], index_col='Open time')
-        df_resampled = df.resample(resample_period).agg({
-            'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'
-        }).dropna()
+        # 미리 불러온 데이터가 있으면 그대로 사용 (여러 전략을 연달아 돌릴 때 로딩을 한 번만 하도록)
+        if df_resampled is None: df_resampled = _load_resampled(DATA_FILE, resample_period)
         print(f"데이터 준비 완료 ({resample_period} 봉)")
     except FileNotFoundError:
         print("데이터 파일을 찾을 수 없습니다."); return None
     
-    start_date, end_date = df_resampled.index[0], df_resampled.index[-1]
-    current_start = start_date
-    all_results, total_steps, current_step = [], 0, 0
-    
-    temp_start = start_date
-    while temp_start + window_size <= end_date:
-        total_steps += 1; temp_start += step_size
+    total_steps = _count_windows(df_resampled.index[0], df_resampled.index[-1], window_size, step_size)
+    task_args = (strategy_function, strategy_param, initial_cash, fee_rate, leverage)
+    # 윈도우별 결과를 담을 배열을 미리 할당 (total_steps는 실제 실행되는 윈도우 수의 상한)
+    strategy_returns, market_returns, strategy_mdds = np.empty(total_steps), np.empty(total_steps), np.empty(total_steps)
+    total_trades, total_liquidations = np.empty(total_steps, dtype=np.int64), np.empty(total_steps, dtype=np.int64)
+    current_step, window_starts = 0, []
     
-    while current_start + window_size <= end_date:
-        current_end = current_start + window_size
-        window_df = df_resampled.loc[current_start:current_end]
-        if len(window_df) < 20: current_start += step_size; continue
-        
-        window_strategy_result = strategy_function(strategy_param, window_df.copy(), initial_cash, fee_rate, leverage)
-        
-        # ⭐ --- 시장 수익률을 레버리지 없는 1배로 계산하도록 수정 ---
-        start_price, end_price = window_df['Close'].iloc[0], window_df['Close'].iloc[-1]
-        market_return_spot = ((end_price / start_price) - 1) * 100
-            
-        all_results.append({
-            'start_date': current_start, 'end_date': current_end,
-            'strategy_return': window_strategy_result['total_return_pct'],
-            'market_return': market_return_spot, # 수정된 값 사용
-            'strategy_mdd': window_strategy_result['mdd_pct'],
-            'total_trades': window_strategy_result['total_trades'],
-            'total_liquidations': window_strategy_result.get('total_liquidations', 0)
-        })
-        current_start += step_size; current_step += 1
+    # ⭐ --- 시장 수익률은 레버리지 없는 1배로 계산 ---
+    for current_start, current_end, window_strategy_result, market_return_spot in _rolling_windows(df_resampled, window_size, step_size, task_args, max_workers):
+        strategy_returns[current_step], market_returns[current_step] = window_strategy_result['total_return_pct'], market_return_spot
+        strategy_mdds[current_step], total_trades[current_step] = window_strategy_result['mdd_pct'], window_strategy_result['total_trades']
+        total_liquidations[current_step] = window_strategy_result.get('total_liquidations', 0)
+        current_step += 1
         if progress_callback: progress_callback(current_step, total_steps)
-        if plot_callback: plot_callback(current_start, window_strategy_result['total_return_pct'], market_return_spot) # 수정된 값 전달
+        if plot_callback: plot_callback(current_start + step_size, window_strategy_result['total_return_pct'], market_return_spot) # 수정된 값 전달
+        if return_windows: window_starts.append(current_start)
     
     
-    if not all_results: print("백테스팅을 실행할 기간이 충분하지 않습니다."); return None
+    if current_step == 0: print("백테스팅을 실행할 기간이 충분하지 않습니다."); return None
         
-    results_df = pd.DataFrame(all_results)
-    avg_return = results_df['strategy_return'].mean()
+    strategy_returns, market_returns = strategy_returns[:current_step], market_returns[:current_step]
+    avg_return = np.nanmean(strategy_returns)
     final_balance = initial_cash * (1 + avg_return / 100)
-    return {
+    results = {
         'leverage': f"{leverage}x", 'final_balance': final_balance, 'total_return_pct': avg_return,
-        'mdd_pct': results_df['strategy_mdd'].mean(),
-        'win_rate_pct': (results_df['strategy_return'] > results_df['market_return']).mean() * 100,
-        'total_trades': results_df['total_trades'].sum(),
-        'avg_liquidations_per_window': results_df['total_liquidations'].mean()
+        'mdd_pct': np.nanmean(strategy_mdds[:current_step]),
+        'win_rate_pct': (strategy_returns > market_returns).mean() * 100,
+        'total_trades': total_trades[:current_step].sum(),
+        'avg_liquidations_per_window': total_liquidations[:current_step].mean()
     }
+    if return_windows:
+        # 윈도우별 상세 결과는 요청한 경우에만 데이터프레임으로 만들어 반환
+        results['windows'] = pd.DataFrame({
+            'strategy_return': strategy_returns, 'market_return': market_returns,
+            'strategy_mdd': strategy_mdds[:current_step], 'total_trades': total_trades[:current_step],
+            'total_liquidations': total_liquidations[:current_step]
+        }, index=pd.DatetimeIndex(window_starts, name='start_date'))
+    return results
 
 
-def backtest_full_period(strategy_function, strategy_param, resample_period='h', start_date=None, initial_cash=100, fee_rate=0.001, leverage=1, plot_callback=None):
+@njit(cache=True)
+def _buy_and_hold_curve(close, coins_held):
+    """매수 후 보유 자산 곡선과 MDD(%)를 한 번의 순회로 계산 (자산 계산, 누적 최고점, 낙폭을 한 루프에서 처리)"""
+    balance = np.empty(close.size)
+    peak, mdd = -np.inf, 0.0
+    for i in range(close.size):
+        balance[i] = coins_held * close[i]
+        if balance[i] > peak: peak = balance[i]
+        drawdown = 1 - balance[i] / peak
+        if drawdown > mdd: mdd = drawdown
+    return balance, mdd * 100
+
+
+def backtest_full_period(strategy_function, strategy_param, resample_period='h', start_date=None, initial_cash=100, fee_rate=0.001, leverage=1, plot_callback=None, df_resampled=None):
     """전체 데이터 기간에 대해 단일 백테스트를 실행 (지표 예열 및 자산 정규화 기능 추가)"""
     print(f"전체 기간 백테스팅을 시작합니다. (레버리지: {leverage}x)")
 
     try:
-        df = pd.read_csv('backtest/data.csv', parse_dates=['Open time'], index_col='Open time')
-        df_resampled = df.resample(resample_period).agg({
-            'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'
-        }).dropna()
+        # 미리 불러온 데이터가 있으면 그대로 사용 (여러 전략을 연달아 돌릴 때 로딩을 한 번만 하도록)
+        if df_resampled is None: df_resampled = _load_resampled(DATA_FILE, resample_period)
         
         warmup_period = 0
         for key, value in strategy_param.items():
@@ -128,17 +288,17 @@ def backtest_full_period(strategy_function, strategy_param, resample_period='h',
                     warmup_period = value
         print(f"지표 예열 기간: {warmup_period} 캔들")
 
-        df_for_strategy = df_resampled.copy()
+        df_for_strategy = df_resampled.copy(deep=False)
         if start_date:
             # ⭐ --- 예열 시작 날짜 계산 로직 수정 ---
             try:
                 # pandas의 to_offset 기능을 사용하여 안정적으로 날짜 계산
                 time_offset = pd.tseries.frequencies.to_offset(resample_period)
                 data_start_date = start_date - (warmup_period * time_offset)
-                df_for_strategy = df_resampled.loc[data_start_date:].copy()
+                df_for_strategy = df_resampled.loc[data_start_date:].copy(deep=False)
             except Exception as e:
                 print(f"예열 기간 계산 중 오류 발생: {e}. 예열 없이 진행합니다.")
-                df_for_strategy = df_resampled.loc[start_date:].copy()
+                df_for_strategy = df_resampled.loc[start_date:].copy(deep=False)
             # ⭐ --- 수정 끝 ---
 
         print(f"데이터 준비 완료 ({resample_period} 봉, 예열 포함 시작: {df_for_strategy.index[0]})")
@@ -148,7 +308,9 @@ def backtest_full_period(strategy_function, strategy_param, resample_period='h',
     # ⭐ --- 3. 예열된 데이터로 전략 실행 ---
     strategy_results = strategy_function(strategy_param, df_for_strategy, initial_cash, fee_rate, leverage)
 
-    raw_asset_history = pd.Series(strategy_results['asset_history'], index=df_for_strategy.index)
+    # 전략은 예열 구간(앞부분)을 잘라낸 뒤의 자산 기록을 반환하므로 데이터의 뒤쪽 봉들과 맞춤
+    asset_history = strategy_results['asset_history']
+    raw_asset_history = pd.Series(asset_history, index=df_for_strategy.index[len(df_for_strategy) - len(asset_history):])
     
     # ⭐ --- 자산 곡선 정규화(Normalization) 로직 시작 ---
     if start_date:
@@ -156,7 +318,7 @@ def backtest_full_period(strategy_function, strategy_param, resample_period='h',
         strategy_asset_history = raw_asset_history.loc[start_date:].copy()
         if not strategy_asset_history.empty:
             # 테스트 시작일의 자산 가치를 확인
-            start_day_asset = strategy_asset_history.iloc[0]
+            start_day_asset = strategy_asset_history.iat[0]
             # 시작 자산을 initial_cash(100)으로 맞추기 위한 보정값 계산
             if start_day_asset != 0:
                 scaling_factor = initial_cash / start_day_asset
@@ -167,44 +329,30 @@ def backtest_full_period(strategy_function, strategy_param, resample_period='h',
 
     # --- 시장(Buy-and-Hold) 자산 기록 계산 ---
     # 시장 수익률은 사용자가 지정한 start_date부터 계산
-    market_df = df_resampled.loc[start_date:].copy() if start_date else df_resampled.copy()
-    market_balance_history = []
-    start_price = market_df['Close'].iloc[0]
-    coins_held = (initial_cash / start_price) * (1 - fee_rate)
-    for i in range(len(market_df)):
-        current_price = market_df['Close'].iloc[i]
-        market_balance_history.append(coins_held * current_price)
+    market_close = (df_resampled.loc[start_date:] if start_date else df_resampled)['Close'].to_numpy()
+    coins_held = (initial_cash / market_close[0]) * (1 - fee_rate)
+    market_balance_history, market_mdd = _buy_and_hold_curve(market_close, coins_held)
 
     # --- 결과 데이터프레임 생성 ---
     results_df = pd.DataFrame(index=strategy_asset_history.index)
     results_df['Strategy'] = strategy_asset_history
     results_df['Market'] = market_balance_history
     
-    # ⭐ --- 콜백 호출 로직 추가 시작 ---
+    strategy_arr, market_arr = results_df['Strategy'].to_numpy(), results_df['Market'].to_numpy()
+
+    # ⭐ --- 콜백 호출: 날짜가 바뀌는 지점(+마지막 데이터 포인트)을 골라서 한 번에 전송 ---
+    # plot_callback(시각 배열, 전략 자산 배열, 시장 자산 배열) 형태로 한 번만 호출되므로 그래프도 한 번만 다시 그림
     if plot_callback:
-        last_date = None
-        # 데이터프레임을 한 줄씩 반복
-        for timestamp, row in results_df.iterrows():
-            current_date = timestamp.date()
-            # 날짜가 바뀔 때마다 콜백 함수 호출
-            if last_date is None or current_date != last_date:
-                plot_callback(timestamp, row['Strategy'], row['Market'])
-                time.sleep(0.001) # UI가 업데이트될 시간을 줌 (시각적 효과)
-                last_date = current_date
-        # 마지막 데이터 포인트도 전송
-        last_row = results_df.iloc[-1]
-        plot_callback(results_df.index[-1], last_row['Strategy'], last_row['Market'])
-    # ⭐ --- 콜백 호출 로직 추가 끝 ---
-    
-    market_series = pd.Series(results_df['Market'])
-    market_mdd = (1 - (market_series / market_series.cummax())).max() * 100
+        days = results_df.index.normalize().asi8
+        points = np.append(np.flatnonzero(np.concatenate(([True], days[1:] != days[:-1]))), len(results_df) - 1)
+        plot_callback(results_df.index[points], strategy_arr[points], market_arr[points])
     
     summary = {
         'initial_cash': initial_cash, 'leverage': f"{leverage}x",
-        'final_strategy_balance': results_df['Strategy'].iloc[-1],
-        'final_market_balance': results_df['Market'].iloc[-1],
-        'total_strategy_return_pct': (results_df['Strategy'].iloc[-1] / initial_cash - 1) * 100,
-        'total_market_return_pct': (results_df['Market'].iloc[-1] / initial_cash - 1) * 100,
+        'final_strategy_balance': strategy_arr[-1],
+        'final_market_balance': market_arr[-1],
+        'total_strategy_return_pct': (strategy_arr[-1] / initial_cash - 1) * 100,
+        'total_market_return_pct': (market_arr[-1] / initial_cash - 1) * 100,
         'strategy_mdd_pct': strategy_results['mdd_pct'],
         'market_mdd_pct': -market_mdd,
         'total_trades': strategy_results['total_trades'],
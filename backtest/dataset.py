@@ -1,10 +1,48 @@
 # dataset.py
 
+import numpy as np
 import pandas as pd
-from binance.client import Client
 from datetime import datetime, timezone
-import time
 import os
+from concurrent.futures import ThreadPoolExecutor
+from . import storage
+
+# 동시에 내려받는 달 수 (get_historical_klines가 요청 3번마다 1초씩 쉬므로
+# 4개 스레드면 초당 약 12회 요청으로 바이낸스의 분당 요청 가중치 한도 안에 머무름)
+DOWNLOAD_WORKERS = 4
+
+def _read_last_timestamp(file_name, tail_size=4096):
+    """CSV 파일의 끝부분만 읽어 마지막 행의 'Open time'을 반환 (데이터 행이 없으면 None)"""
+    with open(file_name, 'rb') as f:
+        f.seek(0, os.SEEK_END); file_size = f.tell()
+        f.seek(max(0, file_size - tail_size))
+        lines = [line for line in f.read().splitlines() if line.strip()]
+    if not lines or lines[-1].startswith(b'Open time'): return None
+    return pd.to_datetime(lines[-1].split(b',', 1)[0].decode(), utc=True)
+
+def _klines_to_df(klines):
+    """바이낸스 캔들 원본 리스트에서 필요한 컬럼(Open time + OHLCV)만 골라 데이터프레임으로 변환"""
+    # 캔들 한 개 = [Open time, Open, High, Low, Close, Volume, Close time, ...] 이므로 앞의 6개 값만 사용
+    columns = list(zip(*klines))[:6]
+    df = pd.DataFrame({col: np.array(values, dtype='float64') for col, values in zip(storage.OHLCV_COLUMNS, columns[1:])})
+    df.insert(0, 'Open time', pd.to_datetime(np.array(columns[0], dtype='int64'), unit='ms', utc=True))
+    return df
+
+def _fetch_month(client, symbol, month_start):
+    """한 달치 1분봉 캔들 원본을 수집 (실패하면 빈 리스트)"""
+    start_str = month_start.strftime('%Y-%m-%d')
+    end_str = (month_start + pd.offsets.MonthEnd(1)).strftime('%Y-%m-%d')
+    print(f"===== {start_str} ~ {end_str} 데이터 수집 시작 =====")
+    try:
+        klines = client.get_historical_klines(
+            symbol=symbol, interval=client.KLINE_INTERVAL_1MINUTE,
+            start_str=start_str, end_str=end_str
+        )
+        print(f"✅ {start_str} 기간 데이터 수집 완료. {len(klines)}개 캔들.")
+        return klines
+    except Exception as e:
+        print(f"❌ {start_str} 기간 데이터 수집 중 에러 발생: {e}")
+        return []
 
 def update_data(file_name='backtest/data.csv', symbol='BTCUSDT'):
     """
@@ -13,6 +51,8 @@ def update_data(file_name='backtest/data.csv', symbol='BTCUSDT'):
     - 파일이 있으면: 마지막 데이터 시점 이후의 1분봉 데이터만 파일 끝에 추가합니다.
     """
     print("--- 데이터 업데이트 스크립트 실행 (최적화 모드) ---")
+    # 바이낸스 클라이언트는 실제로 업데이트할 때만 불러옴 (모듈 import 시 네트워크/의존성 로딩 방지)
+    from binance.client import Client
     client = Client("", "") # API 키와 시크릿 키를 입력하세요
 
     # 1. 기존 데이터 파일 확인
@@ -22,16 +62,17 @@ def update_data(file_name='backtest/data.csv', symbol='BTCUSDT'):
         # ================================================================
         print(f"'{file_name}' 파일을 발견했습니다. 마지막 데이터 이후의 기록을 업데이트합니다.")
         
-        # ※ 성능을 위해 전체 파일을 읽는 대신 마지막 줄만 읽어 날짜를 확인하는 방법도 있지만,
-        #   정확성을 위해 현재는 read_csv를 유지합니다. 파일이 매우 클 경우 이 부분도 개선 가능합니다.
-        existing_df = pd.read_csv(file_name, parse_dates=['Open time'])
-        
-        if existing_df.empty:
+        # 전체 파일을 읽는 대신 파일 끝부분만 읽어 마지막 데이터 시점을 확인 (이어쓰기 방식이라 마지막 줄이 최신)
+        last_date = _read_last_timestamp(file_name)
+        if last_date is None:
             # 파일은 있지만 비어있는 예외적인 경우
             last_date = pd.to_datetime('2018-01-01', utc=True)
         else:
-            existing_df['Open time'] = pd.to_datetime(existing_df['Open time'], utc=True)
-            last_date = existing_df['Open time'].max()
+            if not os.path.exists(storage.parquet_path(file_name)):
+                # Parquet 데이터셋이 아직 없으면 기존 CSV로부터 한 번 생성 (이때만 전체 파일을 읽음)
+                storage.write_parquet(storage.read_csv(file_name), file_name)
+            # 미리 리샘플링된 시간봉 파일이 없으면 생성
+            storage.update_resampled(file_name)
 
         print(f"마지막 데이터 시점: {last_date}")
 
@@ -51,20 +92,11 @@ def update_data(file_name='backtest/data.csv', symbol='BTCUSDT'):
             print("✅ 새롭게 수집된 데이터가 없습니다.")
             return
 
-        new_df = pd.DataFrame(klines, columns=[
-            'Open time', 'Open', 'High', 'Low', 'Close', 'Volume', 'Close time',
-            'Quote asset volume', 'Number of trades', 'Taker buy base asset volume',
-            'Taker buy quote asset volume', 'Ignore'
-        ])
-        
-        new_df = new_df[['Open time', 'Open', 'High', 'Low', 'Close', 'Volume']]
-        new_df['Open time'] = pd.to_datetime(new_df['Open time'], unit='ms', utc=True)
-        for col in ['Open', 'High', 'Low', 'Close', 'Volume']:
-            new_df[col] = pd.to_numeric(new_df[col])
+        new_df = _klines_to_df(klines)
 
         # API는 start_str로 지정된 시간을 포함해서 데이터를 주므로, 첫 행은 중복 데이터임
         # 따라서 중복을 막기 위해 첫 행을 제거
-        if not new_df.empty and new_df['Open time'].iloc[0] == last_date:
+        if not new_df.empty and new_df['Open time'].iat[0] == last_date:
             new_df = new_df.iloc[1:]
 
         if new_df.empty:
@@ -75,6 +107,9 @@ def update_data(file_name='backtest/data.csv', symbol='BTCUSDT'):
         # mode='a'는 append(추가) 모드를 의미
         # header=False는 기존 파일에 헤더(컬럼명)가 이미 있으므로 추가하지 않는다는 의미
         new_df.to_csv(file_name, mode='a', header=False, index=False)
+        # 백테스터가 읽는 Parquet 데이터셋도 갱신 (신규 데이터가 속한 달의 파티션만 다시 씀)
+        storage.write_parquet(new_df, file_name)
+        storage.update_resampled(file_name, since=new_df['Open time'].iat[0])
         
         print(f"🎉 '{file_name}' 파일에 {len(new_df)}개의 신규 데이터를 추가했습니다.")
 
@@ -87,41 +122,23 @@ def update_data(file_name='backtest/data.csv', symbol='BTCUSDT'):
         # ... (이하 로직은 이전과 동일하므로 생략) ...
         start_date = pd.to_datetime('2018-01-01', utc=True)
         dates = pd.date_range(start=start_date, end=datetime.now(timezone.utc), freq='MS')
-        all_data_frames = []
-
-        for month_start in dates:
-            start_str = month_start.strftime('%Y-%m-%d')
-            end_str = (month_start + pd.offsets.MonthEnd(1)).strftime('%Y-%m-%d')
-            print(f"===== {start_str} ~ {end_str} 데이터 수집 시작 =====")
-            try:
-                klines = client.get_historical_klines(
-                    symbol=symbol, interval=Client.KLINE_INTERVAL_1MINUTE,
-                    start_str=start_str, end_str=end_str
-                )
-                if klines:
-                    df_monthly = pd.DataFrame(klines, columns=[
-                        'Open time', 'Open', 'High', 'Low', 'Close', 'Volume', 'Close time',
-                        'Quote asset volume', 'Number of trades', 'Taker buy base asset volume',
-                        'Taker buy quote asset volume', 'Ignore'
-                    ])
-                    all_data_frames.append(df_monthly)
-                    print(f"✅ {start_str} 기간 데이터 수집 완료. {len(klines)}개 캔들.")
-            except Exception as e:
-                print(f"❌ {start_str} 기간 데이터 수집 중 에러 발생: {e}")
-            time.sleep(1)
-
-        if not all_data_frames:
+        # 달마다 독립적으로 요청하므로 여러 스레드로 동시에 수집 (네트워크 대기 시간이 병목)
+        all_klines = []
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+            # map은 요청한 순서대로 결과를 돌려주므로 월 순서가 유지됨
+            for klines in executor.map(lambda month_start: _fetch_month(client, symbol, month_start), dates):
+                all_klines.extend(klines)
+
+        if not all_klines:
             print("데이터 수집에 실패했습니다.")
             return
             
-        final_df = pd.concat(all_data_frames, ignore_index=True)
-        final_df = final_df[['Open time', 'Open', 'High', 'Low', 'Close', 'Volume']]
-        final_df['Open time'] = pd.to_datetime(final_df['Open time'], unit='ms', utc=True)
-        for col in ['Open', 'High', 'Low', 'Close', 'Volume']:
-            final_df[col] = pd.to_numeric(final_df[col])
+        final_df = _klines_to_df(all_klines)
 
         final_df.drop_duplicates(subset=['Open time'], keep='last', inplace=True)
         final_df.sort_values(by='Open time', inplace=True)
         # 처음 생성할 때는 헤더를 포함하여 저장
         final_df.to_csv(file_name, index=False)
+        storage.write_parquet(final_df, file_name)
+        storage.update_resampled(file_name, since=final_df['Open time'].iat[0])
         print(f"🎉 '{file_name}' 파일 생성 완료! 총 {len(final_df)}개 데이터.")
\ No newline at end of file
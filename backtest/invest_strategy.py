@@ -2,54 +2,786 @@
 
 import numpy as np
 import pandas as pd
+from collections import OrderedDict
+from ._njit import njit, prange
 
 # ==============================================================================
 # 헬퍼 함수 (지표 직접 계산 및 안정성 강화)
 # ==============================================================================
 
 MAX_ASSET_VALUE = 1e15  # 자산 최대 상한선 (1000조)
+# 포지션 상태 (문자열 비교 대신 정수 코드 사용, njit 커널과 파이썬 루프가 같은 값을 씀)
+POSITION_NONE, POSITION_LONG, POSITION_SHORT = 0, 1, -1
 
 def calculate_rsi(data, period=14):
     delta = data.diff()
     gain = delta.where(delta > 0, 0); loss = -delta.where(delta < 0, 0)
-    avg_gain = gain.ewm(com=period - 1, min_periods=period).mean(); avg_loss = loss.ewm(com=period - 1, min_periods=period).mean()
-    if avg_loss.empty or avg_loss.iloc[-1] == 0: return 100.0
+    avg_gain = _ewm_mean(gain, com=period - 1, min_periods=period); avg_loss = _ewm_mean(loss, com=period - 1, min_periods=period)
+    if avg_loss.empty or avg_loss.iat[-1] == 0: return 100.0
     rs = avg_gain / avg_loss
     return 100 - (100 / (1 + rs))
 
 def calculate_bbands(df, length=20, std_dev=2):
-    middle_band = df['Close'].rolling(window=length).mean(); std = df['Close'].rolling(window=length).std()
+    middle_band = _rolling_mean(df['Close'], length); std = _rolling_std(df['Close'], length)
     df['BBM'] = middle_band; df['BBU'] = middle_band + (std * std_dev); df['BBL'] = middle_band - (std * std_dev)
     return df
 
 def calculate_adx(df, period=14):
-    df['H-L'] = df['High'] - df['Low']; df['H-PC'] = abs(df['High'] - df['Close'].shift(1)); df['L-PC'] = abs(df['Low'] - df['Close'].shift(1))
-    df['TR'] = df[['H-L', 'H-PC', 'L-PC']].max(axis=1)
-    df['+DM'] = np.where((df['High'] - df['High'].shift(1)) > (df['Low'].shift(1) - df['Low']), df['High'] - df['High'].shift(1), 0)
-    df['-DM'] = np.where((df['Low'].shift(1) - df['Low']) > (df['High'] - df['High'].shift(1)), df['Low'].shift(1) - df['Low'], 0)
-    ATR = df['TR'].ewm(alpha=1/period, min_periods=period).mean(); ADX_plus = df['+DM'].ewm(alpha=1/period, min_periods=period).mean(); ADX_minus = df['-DM'].ewm(alpha=1/period, min_periods=period).mean()
+    high, low, close = df['High'].to_numpy(dtype=np.float64), df['Low'].to_numpy(dtype=np.float64), df['Close'].to_numpy(dtype=np.float64)
+    prev_high, prev_low, prev_close = _shift1(high), _shift1(low), _shift1(close)
+    # 첫 봉은 전일 종가가 NaN이므로 fmax로 NaN을 건너뜀 (DataFrame.max(axis=1)와 같은 결과, H-L/H-PC/L-PC 컬럼은 만들지 않음)
+    df['TR'] = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    up_move, down_move = high - prev_high, prev_low - low
+    df['+DM'] = np.where(up_move > down_move, up_move, 0); df['-DM'] = np.where(down_move > up_move, down_move, 0)
+    # alpha=1/period를 pandas와 같은 방식으로 com으로 변환
+    com = (1 - 1/period) / (1/period)
+    ATR = _ewm_mean(df['TR'], com, min_periods=period); ADX_plus = _ewm_mean(df['+DM'], com, min_periods=period); ADX_minus = _ewm_mean(df['-DM'], com, min_periods=period)
     df['+DI'] = (ADX_plus / ATR) * 100; df['-DI'] = (ADX_minus / ATR) * 100
     DX = (abs(df['+DI'] - df['-DI']) / (df['+DI'] + df['-DI'])).fillna(0) * 100
-    df['ADX'] = DX.ewm(alpha=1/period, min_periods=period).mean()
+    df['ADX'] = _ewm_mean(DX, com, min_periods=period)
     return df
 
-def _calculate_pnl(entry_price, exit_price, position_margin, leverage, position_type):
-    if entry_price <= 0 or exit_price <= 0: return 0
-    if position_type == 'long': pnl = ((exit_price / entry_price) - 1) * position_margin * leverage
-    elif position_type == 'short': pnl = ((entry_price / exit_price) - 1) * position_margin * leverage
-    else: pnl = 0
-    return 0 if not np.isfinite(pnl) else pnl
+# MACD 히스토그램 색 (문자열 대신 int8 코드로 저장, 코드 = 0선 위 여부 * 2 + 직전 봉 대비 상승 여부)
+HIST_BRIGHT_MAGENTA, HIST_DARK_MAGENTA, HIST_DARK_BLUE, HIST_BRIGHT_BLUE = 0, 1, 2, 3
+# macd_liquidity_tracker의 시스템 종류 (문자열은 함수 시작 시 한 번만 코드로 변환)
+SYSTEM_NORMAL, SYSTEM_FAST, SYSTEM_SAFE, SYSTEM_CROSSOVER, SYSTEM_UNKNOWN = 0, 1, 2, 3, -1
+_SYSTEM_TYPES = {'Normal': SYSTEM_NORMAL, 'Fast': SYSTEM_FAST, 'Safe': SYSTEM_SAFE, 'Crossover': SYSTEM_CROSSOVER}
 
-def _calculate_asset(entry_price, current_price, position_margin, leverage, position_type, cash):
-    if position_type == 'none': return cash
+def _hist_colors(hist):
+    """MACD 히스토그램 색 코드 (0선 위/아래와 직전 봉 대비 상승 여부로 구분, 첫 봉은 상승이 아닌 것으로 봄)"""
+    is_rising = np.zeros(len(hist), dtype=np.bool_); is_rising[1:] = hist[1:] > hist[:-1]
+    # 색마다 마스크를 따로 만들지 않고 두 비트를 합쳐 코드를 한 번에 계산
+    return ((hist > 0).astype(np.int8) << 1) | is_rising
+
+def _shift1(values):
+    """Series.shift(1)의 넘파이 버전 (첫 값은 NaN)"""
+    shifted = np.empty_like(values); shifted[:1] = np.nan; shifted[1:] = values[:-1]
+    return shifted
+
+def _max_drawdown_pct(asset_history):
+    """자산 기록의 최대 낙폭(%) (pandas Series/누적 최고점 배열 없이 한 번 순회로 계산, 기록이 없으면 0)"""
+    asset_history = np.asarray(asset_history, dtype=np.float64)
+    return _max_drawdown_nb(asset_history) * 100 if asset_history.size else 0
+
+# ==============================================================================
+# njit 매매 루프 (넘파이 배열만 사용, pandas .iloc 조회 없음)
+# ==============================================================================
+
+# 가격/지표 배열은 float64로 유지 (float32로 가격만 반올림해도 1시간봉 볼린저 전략 수익률이 약 3e-4%p,
+# MACD 이중 필터 전략은 약 2e-5%p 달라지고, 지표 계산까지 float32로 하면 교차 시점 자체가 바뀔 수 있음)
+# 메모리는 봉 단위 상태를 int8 코드/불리언 배열로 두는 것으로 줄임
+
+@njit(cache=True)
+def _pnl_nb(entry_price, exit_price, position_margin, leverage, position):
+    """포지션 손익 (position: 1=롱, -1=숏, 가격이 0 이하이거나 결과가 유한하지 않으면 0)"""
+    if entry_price <= 0 or exit_price <= 0: return 0.0
+    if position == POSITION_LONG: pnl = ((exit_price / entry_price) - 1) * position_margin * leverage
+    elif position == POSITION_SHORT: pnl = ((entry_price / exit_price) - 1) * position_margin * leverage
+    else: pnl = 0.0
+    return pnl if np.isfinite(pnl) else 0.0
+
+@njit(cache=True)
+def _mtm_coefficients(entry_price, position_margin, leverage, position):
+    """
+    보유 중 평가금액을 base + slope * x 로 계산하기 위한 계수 (진입 시 한 번만 계산)
+    - 롱: x = 현재가, 숏: x = 1 / 현재가 (평가금액 = 증거금 + (가격 비율 - 1) x 증거금 x 레버리지 식을 전개한 것)
+    """
+    margin_leverage = position_margin * leverage
+    if position == POSITION_LONG: return position_margin - margin_leverage, margin_leverage / entry_price
+    return position_margin - margin_leverage, entry_price * margin_leverage
+
+@njit(cache=True)
+def _asset_nb(current_price, mtm_base, mtm_slope, entry_price, position, cash):
+    """보유 포지션의 평가금액 (포지션이 없으면 cash, 진입 시 계산한 계수로 봉마다 곱셈/나눗셈 한 번만 수행)"""
+    if position == POSITION_NONE: return cash
     if entry_price <= 0 or current_price <= 0: return cash
-    if position_type == 'long': asset = position_margin + (((current_price / entry_price) - 1) * position_margin * leverage)
-    elif position_type == 'short': asset = position_margin + (((entry_price / current_price) - 1) * position_margin * leverage)
+    if position == POSITION_LONG: asset = mtm_base + mtm_slope * current_price
+    elif position == POSITION_SHORT: asset = mtm_base + mtm_slope / current_price
     else: asset = cash
     if not np.isfinite(asset): return cash
     # ⭐ 자산 상한선 적용
     return min(asset, MAX_ASSET_VALUE)
 
+@njit(cache=True, error_model='numpy')
+def _drawdown_step(asset, peak, max_drawdown):
+    """자산 값 하나로 (누적 최고점, 최대 낙폭)을 갱신 (pandas cummax처럼 NaN은 건너뜀, 시작값은 (-inf, NaN))"""
+    if np.isnan(asset): return peak, max_drawdown
+    if asset > peak: peak = asset
+    drawdown = 1 - asset / peak
+    if not np.isnan(drawdown) and not drawdown <= max_drawdown: max_drawdown = drawdown
+    return peak, max_drawdown
+
+@njit(cache=True)
+def _max_drawdown_nb(asset_history):
+    """누적 최고점과 최대 낙폭을 스칼라로 갱신하며 최대 낙폭(비율)을 계산 (유효한 낙폭이 없으면 NaN)"""
+    peak, max_drawdown = -np.inf, np.nan
+    for asset in asset_history: peak, max_drawdown = _drawdown_step(asset, peak, max_drawdown)
+    return max_drawdown
+
+@njit(cache=True)
+def _exit_price_nb(position, low, high, liquidation_price, stop_loss_price, take_profit_price, use_stop_loss, use_take_profit):
+    """
+    보유 포지션이 이번 봉에서 청산/손절/익절되는 가격 (해당 없으면 0, 반환: (가격, 강제청산 여부))
+    - 세 조건을 모두 계산한 뒤 강제청산 > 손절 > 익절 순서로 고름 (if/elif 분기 대신 선택 연산으로 컴파일됨)
+    """
+    if position == POSITION_LONG:
+        hit_liquidation = low <= liquidation_price
+        hit_stop_loss = use_stop_loss & (low <= stop_loss_price); hit_take_profit = use_take_profit & (high >= take_profit_price)
+    else:
+        hit_liquidation = high >= liquidation_price
+        hit_stop_loss = use_stop_loss & (high >= stop_loss_price); hit_take_profit = use_take_profit & (low <= take_profit_price)
+    exit_price = liquidation_price if hit_liquidation else (stop_loss_price if hit_stop_loss else (take_profit_price if hit_take_profit else 0.0))
+    return exit_price, hit_liquidation
+
+@njit(cache=True)
+def _risk_prices_nb(entry_price, position, liq_frac, stop_frac, take_frac):
+    """
+    진입가 기준 (청산가, 손절가, 익절가) (롱/숏 식을 포지션 부호(+1/-1) 하나로 합쳐 분기 없이 계산)
+    - liq_frac = 1 / 레버리지 (강제청산이 없으면 inf라서 롱은 -inf, 숏은 inf가 되어 닿지 않음)
+    - stop_frac/take_frac = 손절/익절 비율(%) / 100
+    """
+    side = float(position)
+    return entry_price * (1 - side * liq_frac), entry_price * (1 + side * stop_frac), entry_price * (1 + side * take_frac)
+
+def _crossovers(fast, slow, strict=False):
+    """골든/데드 크로스 여부를 봉마다 미리 계산 (0번째 봉은 항상 False, strict면 직전 봉에서 두 값이 같을 때는 교차로 보지 않음)"""
+    fast, slow = np.asarray(fast), np.asarray(slow)
+    cross_up, cross_down = np.zeros(len(fast), dtype=np.bool_), np.zeros(len(fast), dtype=np.bool_)
+    if strict: cross_up[1:] = (fast[:-1] < slow[:-1]) & (fast[1:] > slow[1:]); cross_down[1:] = (fast[:-1] > slow[:-1]) & (fast[1:] < slow[1:])
+    else: cross_up[1:] = (fast[:-1] <= slow[:-1]) & (fast[1:] > slow[1:]); cross_down[1:] = (fast[:-1] >= slow[:-1]) & (fast[1:] < slow[1:])
+    return cross_up, cross_down
+
+def _trend_filter(long_signal, short_signal, close, trend_ma):
+    """롱 신호는 종가 > 추세선, 숏 신호는 종가 < 추세선인 봉만 남김 (비교 결과 버퍼 하나를 재사용하며 신호 배열을 제자리에서 갱신)"""
+    passed = np.greater(close, trend_ma); np.logical_and(long_signal, passed, out=long_signal)
+    np.less(close, trend_ma, out=passed); np.logical_and(short_signal, passed, out=short_signal)
+    return long_signal, short_signal
+
+def _signal_events(long_signal, short_signal):
+    """롱/숏 신호를 봉마다 하나의 int8 코드(POSITION_LONG/POSITION_SHORT/POSITION_NONE)로 합침 (둘 다 참이면 롱 우선)"""
+    return np.where(long_signal, POSITION_LONG, np.where(short_signal, POSITION_SHORT, POSITION_NONE)).astype(np.int8)
+
+@njit(cache=True)
+def _first_valid_nb(values):
+    """처음으로 NaN이 아닌 값의 위치 (없으면 길이), 예열 구간만 훑고 멈추므로 배열 전체를 검사하지 않음"""
+    for i in range(values.size):
+        if not np.isnan(values[i]): return i
+    return values.size
+
+def _warmup_length(*indicators):
+    """지표들이 모두 계산되기 시작하는 행 위치 (NaN은 예열 구간인 앞부분에만 생기므로 dropna 대신 이 위치부터 잘라서 사용)"""
+    return max((_first_valid_nb(np.asarray(values, dtype=np.float64)) for values in indicators), default=0)
+
+@njit(cache=True)
+def _spike_events_nb(open_prices, close, spike_pct, fall_pct):
+    """
+    직전 캔들 상승률((종가 / 시가 - 1) * 100)이 spike_pct 이상이면 롱, fall_pct 이하이면 숏 신호 코드 (첫 봉은 신호 없음)
+    - 상승률 배열과 급등/급락 마스크를 따로 만들지 않고 한 번 순회로 int8 코드를 바로 채움
+    """
+    events = np.zeros(close.size, dtype=np.int8)
+    for i in range(1, close.size):
+        change = (close[i - 1] / open_prices[i - 1] - 1) * 100
+        if change >= spike_pct: events[i] = POSITION_LONG
+        elif change <= fall_pct: events[i] = POSITION_SHORT
+    return events
+
+def _threshold_crosses(values, oversold_threshold, overbought_threshold):
+    """과매도 구간 탈출(매수)/과매수 구간 이탈(매도) 신호를 봉마다 미리 계산"""
+    values = np.asarray(values)
+    buy, sell = np.zeros(len(values), dtype=np.bool_), np.zeros(len(values), dtype=np.bool_)
+    buy[1:] = (values[:-1] < oversold_threshold) & (values[1:] >= oversold_threshold)
+    sell[1:] = (values[:-1] > overbought_threshold) & (values[1:] <= overbought_threshold)
+    return buy, sell
+
+@njit(cache=True)
+def _ewm_step(weighted, old_wt, cur, alpha, adjust):
+    """pandas ewm().mean()의 점화식으로 가중 평균을 한 봉 갱신 (결측값 없는 입력 기준, 반환: (평균, 누적 가중치))"""
+    old_wt *= 1. - alpha
+    # pandas와 같이 값이 같으면 갱신하지 않음 (일정한 구간에서 반올림 오차 방지)
+    if weighted != cur:
+        new_wt = 1. if adjust else alpha
+        weighted = (old_wt * weighted + new_wt * cur) / (old_wt + new_wt)
+    return weighted, (old_wt + 1. if adjust else 1.)
+
+@njit(cache=True)
+def _ewm_mean_nb(values, com, adjust, min_periods):
+    """pandas Series.ewm(com=com, adjust=adjust, min_periods=min_periods).mean()의 njit 버전 (NaN은 pandas처럼 가중치만 감쇠)"""
+    n = values.size
+    out = np.empty(n)
+    alpha, min_periods = 1. / (1. + com), max(min_periods, 1)
+    weighted, old_wt, nobs = np.nan, 1.0, 0
+    for i in range(n):
+        cur = values[i]; is_observation = not np.isnan(cur)
+        if is_observation: nobs += 1
+        if i == 0: weighted = cur
+        elif not np.isnan(weighted):
+            if is_observation: weighted, old_wt = _ewm_step(weighted, old_wt, cur, alpha, adjust)
+            else: old_wt *= 1. - alpha
+        elif is_observation: weighted = cur
+        out[i] = weighted if nobs >= min_periods else np.nan
+    return out
+
+@njit(cache=True)
+def _rolling_mean_nb(values, window):
+    """pandas Series.rolling(window).mean()의 njit 버전 (pandas와 같은 Kahan 합산, 같은 값이 이어지는 구간 보정 포함)"""
+    # 창 길이와 무관하게 O(N) 누적 갱신이라 4800봉 같은 긴 시장 국면 MA도 빠름
+    # (bottleneck.move_mean은 보정 없는 합산이라 pandas와 값이 미세하게 달라 교차 신호가 바뀔 수 있어 쓰지 않음)
+    n = values.size
+    out = np.empty(n)
+    nobs, neg_ct, same_ct, sum_x, comp_add, comp_remove, prev_value = 0, 0, 0, 0.0, 0.0, 0.0, np.nan
+    for i in range(n):
+        if i == 0 or window <= 1:
+            # 첫 윈도우(또는 윈도우 1)는 처음부터 다시 합산
+            nobs, neg_ct, same_ct, sum_x, comp_add, comp_remove = 0, 0, 0, 0.0, 0.0, 0.0
+            prev_value = values[max(0, i - window + 1)]
+            added_from = max(0, i - window + 1)
+        else:
+            added_from = i
+            if i - window >= 0:
+                val = values[i - window]
+                if not np.isnan(val):
+                    nobs -= 1
+                    y = -val - comp_remove; t = sum_x + y; comp_remove = t - sum_x - y; sum_x = t
+                    if np.signbit(val): neg_ct -= 1
+        for j in range(added_from, i + 1):
+            val = values[j]
+            if not np.isnan(val):
+                nobs += 1
+                y = val - comp_add; t = sum_x + y; comp_add = t - sum_x - y; sum_x = t
+                if np.signbit(val): neg_ct += 1
+                same_ct = same_ct + 1 if val == prev_value else 1
+                prev_value = val
+        if nobs >= window and nobs > 0:
+            result = sum_x / nobs
+            if same_ct >= nobs: result = prev_value
+            elif neg_ct == 0 and result < 0: result = 0.0
+            elif neg_ct == nobs and result > 0: result = 0.0
+            out[i] = result
+        else:
+            out[i] = np.nan
+    return out
+
+@njit(cache=True)
+def _rolling_std_nb(values, window, ddof):
+    """pandas Series.rolling(window).std(ddof)의 njit 버전 (pandas와 같은 Kahan 보정 Welford 분산)"""
+    n = values.size
+    out = np.empty(n)
+    nobs, same_ct, mean_x, ssqdm_x, comp_add, comp_remove, prev_value = 0.0, 0, 0.0, 0.0, 0.0, 0.0, np.nan
+    for i in range(n):
+        if i == 0 or window <= 1:
+            nobs, same_ct, mean_x, ssqdm_x, comp_add, comp_remove = 0.0, 0, 0.0, 0.0, 0.0, 0.0
+            prev_value = values[max(0, i - window + 1)]
+            added_from = max(0, i - window + 1)
+        else:
+            added_from = i
+            if i - window >= 0:
+                val = values[i - window]
+                if not np.isnan(val):
+                    nobs -= 1
+                    if nobs:
+                        prev_mean = mean_x - comp_remove
+                        y = val - comp_remove; t = y - mean_x; comp_remove = t + mean_x - y
+                        mean_x = mean_x - t / nobs
+                        ssqdm_x = ssqdm_x - (val - prev_mean) * (val - mean_x)
+                    else:
+                        mean_x = ssqdm_x = 0.0
+        for j in range(added_from, i + 1):
+            val = values[j]
+            if np.isnan(val): continue
+            nobs += 1
+            same_ct = same_ct + 1 if val == prev_value else 1
+            prev_value = val
+            prev_mean = mean_x - comp_add
+            y = val - comp_add; t = y - mean_x; comp_add = t + mean_x - y
+            mean_x = mean_x + t / nobs if nobs else 0.0
+            ssqdm_x = ssqdm_x + (val - prev_mean) * (val - mean_x)
+        if nobs >= max(window, 1) and nobs > ddof:
+            var = 0.0 if (nobs == 1 or same_ct >= nobs) else ssqdm_x / (nobs - ddof)
+            out[i] = np.sqrt(var) if var >= 0 else 0.0
+        else:
+            out[i] = np.nan
+    return out
+
+def _rolling_mean(values, window):
+    """Series.rolling(window).mean()과 같은 값을 넘파이 배열로 반환 (values는 Series나 넘파이 배열, 캐시 사용, 읽기 전용)"""
+    return _cached_indicator(_rolling_mean_nb, (np.asarray(values, dtype=np.float64),), window)
+
+def _rolling_std(values, window, ddof=1):
+    """Series.rolling(window).std()와 같은 값을 넘파이 배열로 반환 (values는 Series나 넘파이 배열, 캐시 사용, 읽기 전용)"""
+    return _cached_indicator(_rolling_std_nb, (np.asarray(values, dtype=np.float64),), window, ddof)
+
+def _ewm_mean(series, com, min_periods=0, adjust=True):
+    """series.ewm(com=com, min_periods=min_periods, adjust=adjust).mean()과 같은 값을 njit 커널로 계산"""
+    return pd.Series(_ewm_mean_nb(series.to_numpy(dtype=np.float64), float(com), adjust, min_periods), index=series.index)
+
+@njit(cache=True, error_model='numpy')
+def _adx_rsi_ema_nb(high, low, close, adx_com, adx_period, rsi_com, rsi_period, ema_short_com, ema_long_com):
+    """
+    calculate_adx/calculate_rsi/EMA를 OHLC 한 번 순회로 계산 (중간 컬럼 없이 ADX, RSI, EMA_short, EMA_long만 반환)
+    - 지수평균은 pandas ewm과 같은 점화식이므로 값이 동일합니다 (ADX/RSI는 adjust=True, EMA는 adjust=False).
+    - 예열 구간으로 잘라낼 봉(전일 종가가 없는 첫 봉, DI를 계산할 수 없는 봉)은 ADX를 NaN으로 둡니다.
+    """
+    n = close.size
+    adx_out, rsi_out, ema_short_out, ema_long_out = np.empty(n), np.empty(n), np.empty(n), np.empty(n)
+    adx_alpha, rsi_alpha = 1. / (1. + adx_com), 1. / (1. + rsi_com)
+    ema_short_alpha, ema_long_alpha = 1. / (1. + ema_short_com), 1. / (1. + ema_long_com)
+    atr = plus_dm_avg = minus_dm_avg = adx = avg_gain = avg_loss = ema_short = ema_long = 0.0
+    atr_wt = plus_wt = minus_wt = adx_wt = gain_wt = loss_wt = 1.0
+    for i in range(n):
+        if i == 0:
+            # 첫 봉은 전일 값이 없으므로 TR = 고가 - 저가, DM/상승폭/하락폭 = 0
+            atr, plus_dm_avg, minus_dm_avg, avg_gain, avg_loss = high[0] - low[0], 0.0, 0.0, 0.0, -0.0
+            ema_short = ema_long = close[0]
+        else:
+            tr = max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+            up_move, down_move = high[i] - high[i - 1], low[i - 1] - low[i]
+            plus_dm = up_move if up_move > down_move else 0.0; minus_dm = down_move if down_move > up_move else 0.0
+            delta = close[i] - close[i - 1]
+            gain = delta if delta > 0 else 0.0; loss = -(delta if delta < 0 else 0.0)
+            atr, atr_wt = _ewm_step(atr, atr_wt, tr, adx_alpha, True)
+            plus_dm_avg, plus_wt = _ewm_step(plus_dm_avg, plus_wt, plus_dm, adx_alpha, True)
+            minus_dm_avg, minus_wt = _ewm_step(minus_dm_avg, minus_wt, minus_dm, adx_alpha, True)
+            avg_gain, gain_wt = _ewm_step(avg_gain, gain_wt, gain, rsi_alpha, True)
+            avg_loss, loss_wt = _ewm_step(avg_loss, loss_wt, loss, rsi_alpha, True)
+            ema_short, _ = _ewm_step(ema_short, 1.0, close[i], ema_short_alpha, False)
+            ema_long, _ = _ewm_step(ema_long, 1.0, close[i], ema_long_alpha, False)
+        # min_periods 이전 구간은 NaN
+        if i + 1 >= adx_period:
+            plus_di, minus_di = (plus_dm_avg / atr) * 100, (minus_dm_avg / atr) * 100
+        else:
+            plus_di = minus_di = np.nan
+        dx = abs(plus_di - minus_di) / (plus_di + minus_di)
+        dx = (0.0 if np.isnan(dx) else dx) * 100
+        if i == 0: adx = dx
+        else: adx, adx_wt = _ewm_step(adx, adx_wt, dx, adx_alpha, True)
+        adx_out[i] = adx if i > 0 and i + 1 >= adx_period and not (np.isnan(plus_di) or np.isnan(minus_di)) else np.nan
+        rsi_out[i] = 100 - (100 / (1 + avg_gain / avg_loss)) if i + 1 >= rsi_period else np.nan
+        ema_short_out[i], ema_long_out[i] = ema_short, ema_long
+    # calculate_rsi와 같이 마지막 평균 하락폭이 0이면 RSI 전체를 100으로 둠
+    if n == 0 or (n >= rsi_period and avg_loss == 0): rsi_out[:] = 100.0
+    return adx_out, rsi_out, ema_short_out, ema_long_out
+
+@njit(cache=True, error_model='numpy')
+def _adx_nb(high, low, close, com, period):
+    """
+    calculate_adx의 ADX 값을 OHLC 한 번 순회로 계산 (TR/DM/DI 컬럼을 만들지 않음, 지수평균은 pandas ewm과 같은 점화식)
+    - calculate_adx처럼 DX가 NaN이면 0으로 보므로 ADX는 min_periods 이전 구간만 NaN입니다.
+    """
+    n = close.size
+    adx_out = np.empty(n)
+    alpha = 1. / (1. + com)
+    atr = plus_dm_avg = minus_dm_avg = adx = 0.0
+    atr_wt = plus_wt = minus_wt = adx_wt = 1.0
+    for i in range(n):
+        if i == 0:
+            # 첫 봉은 전일 값이 없으므로 TR = 고가 - 저가, DM = 0
+            atr, plus_dm_avg, minus_dm_avg = high[0] - low[0], 0.0, 0.0
+        else:
+            tr = max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+            up_move, down_move = high[i] - high[i - 1], low[i - 1] - low[i]
+            plus_dm = up_move if up_move > down_move else 0.0; minus_dm = down_move if down_move > up_move else 0.0
+            atr, atr_wt = _ewm_step(atr, atr_wt, tr, alpha, True)
+            plus_dm_avg, plus_wt = _ewm_step(plus_dm_avg, plus_wt, plus_dm, alpha, True)
+            minus_dm_avg, minus_wt = _ewm_step(minus_dm_avg, minus_wt, minus_dm, alpha, True)
+        if i + 1 >= period:
+            plus_di, minus_di = (plus_dm_avg / atr) * 100, (minus_dm_avg / atr) * 100
+            dx = abs(plus_di - minus_di) / (plus_di + minus_di)
+            dx = (0.0 if np.isnan(dx) else dx) * 100
+        else:
+            dx = 0.0
+        if i == 0: adx = dx
+        else: adx, adx_wt = _ewm_step(adx, adx_wt, dx, alpha, True)
+        adx_out[i] = adx if i + 1 >= period else np.nan
+    return adx_out
+
+@njit(cache=True)
+def _macd_trend_nb(close, fast_com, slow_com, signal_com, trend_com):
+    """
+    MACD선/신호선/추세 EMA를 종가 한 번 순회로 계산 (지표마다 배열을 따로 읽고 쓰지 않음)
+    - 모두 adjust=False 지수평균이며 pandas ewm과 같은 점화식이므로 값이 동일합니다. (결측값 없는 입력 기준)
+    """
+    n = close.size
+    macd_out, signal_out, trend_out = np.empty(n), np.empty(n), np.empty(n)
+    fast_alpha, slow_alpha = 1. / (1. + fast_com), 1. / (1. + slow_com)
+    signal_alpha, trend_alpha = 1. / (1. + signal_com), 1. / (1. + trend_com)
+    ema_fast = ema_slow = signal = trend = 0.0
+    for i in range(n):
+        price = close[i]
+        if i == 0:
+            ema_fast = ema_slow = trend = price; signal = ema_fast - ema_slow
+        else:
+            ema_fast, _ = _ewm_step(ema_fast, 1.0, price, fast_alpha, False)
+            ema_slow, _ = _ewm_step(ema_slow, 1.0, price, slow_alpha, False)
+            signal, _ = _ewm_step(signal, 1.0, ema_fast - ema_slow, signal_alpha, False)
+            trend, _ = _ewm_step(trend, 1.0, price, trend_alpha, False)
+        macd_out[i], signal_out[i], trend_out[i] = ema_fast - ema_slow, signal, trend
+    return macd_out, signal_out, trend_out
+
+@njit(cache=True)
+def _ma_crossover_loop(close, cross_up, cross_down, initial_cash, fee_rate, include_initial=False):
+    """현물 골든/데드 크로스 루프 (자산 기록은 1번 봉부터, include_initial이면 맨 앞에 초기 자본을 넣은 채로 할당)"""
+    n = close.size
+    offset = 1 if include_initial else 0
+    asset_history = np.empty(max(n - 1 + offset, 0))
+    if offset and n > 0: asset_history[0] = initial_cash
+    cash, coins, trades, fee_mult = initial_cash, 0.0, 0, 1 - fee_rate
+    for i in range(1, n):
+        if cross_up[i] and cash > 0:
+            coins = (cash / close[i]) * fee_mult; cash = 0.0; trades += 1
+        elif cross_down[i] and coins > 0:
+            cash = (coins * close[i]) * fee_mult; coins = 0.0; trades += 1
+        asset_history[i - 1 + offset] = cash + coins * close[i]
+    return asset_history, trades
+
+@njit(cache=True)
+def _signal_leverage_loop(close, low, high, events, initial_cash, fee_rate, leverage):
+    """신호 반대 방향 포지션은 청산 후 바로 진입하는 레버리지 루프 (MA 크로스/RSI 전략 공용)"""
+    n = close.size
+    asset_history = np.empty(n); asset_history[0] = initial_cash
+    cash, trades, liquidations, position, entry_price, position_margin, liquidation_price = initial_cash, 0, 0, POSITION_NONE, 0.0, 0.0, 0.0
+    # 청산가 = 진입가 x 고정 배율이므로 배율은 루프 밖에서 한 번만 계산
+    liq_long_factor, liq_short_factor = 1 - 1/leverage, 1 + 1/leverage
+    fee_mult, mtm_base, mtm_slope = 1 - fee_rate, 0.0, 0.0
+    for i in range(1, n):
+        current_price = close[i]
+        # 청산되면 자산이 0이 되고 이후 거래가 없으므로 남은 봉을 한 번에 채우고 종료
+        if position == POSITION_LONG and low[i] <= liquidation_price:
+            cash, position, liquidations = 0.0, POSITION_NONE, liquidations + 1; asset_history[i:] = cash; break
+        elif position == POSITION_SHORT and high[i] >= liquidation_price:
+            cash, position, liquidations = 0.0, POSITION_NONE, liquidations + 1; asset_history[i:] = cash; break
+        if cash <= 0:
+            if position == POSITION_NONE: asset_history[i:] = cash; break
+            asset_history[i] = cash; continue
+        event = events[i]
+        if event == POSITION_LONG:
+            if position == POSITION_SHORT:
+                pnl = _pnl_nb(entry_price, current_price, position_margin, leverage, POSITION_SHORT)
+                cash = (position_margin + pnl) * fee_mult; cash = min(cash, MAX_ASSET_VALUE)
+                position, trades = POSITION_NONE, trades + 1
+            if position == POSITION_NONE:
+                position_margin, entry_price, position, trades = cash, current_price, POSITION_LONG, trades + 1; liquidation_price = entry_price * liq_long_factor
+                mtm_base, mtm_slope = _mtm_coefficients(entry_price, position_margin, leverage, position)
+        elif event == POSITION_SHORT:
+            if position == POSITION_LONG:
+                pnl = _pnl_nb(entry_price, current_price, position_margin, leverage, POSITION_LONG)
+                cash = (position_margin + pnl) * fee_mult; cash = min(cash, MAX_ASSET_VALUE)
+                position, trades = POSITION_NONE, trades + 1
+            if position == POSITION_NONE:
+                position_margin, entry_price, position, trades = cash, current_price, POSITION_SHORT, trades + 1; liquidation_price = entry_price * liq_short_factor
+                mtm_base, mtm_slope = _mtm_coefficients(entry_price, position_margin, leverage, position)
+        asset_history[i] = _asset_nb(current_price, mtm_base, mtm_slope, entry_price, position, cash)
+    return asset_history, trades, liquidations
+
+@njit(cache=True)
+def _bollinger_band_leverage_loop(close, low, high, above_middle, below_middle, below_lower, above_upper, initial_cash, fee_rate, leverage):
+    n = close.size
+    asset_history = np.empty(n); asset_history[0] = initial_cash
+    cash, trades, liquidations, position, entry_price, position_margin, liquidation_price = initial_cash, 0, 0, POSITION_NONE, 0.0, 0.0, 0.0
+    # 청산가 = 진입가 x 고정 배율이므로 배율은 루프 밖에서 한 번만 계산
+    liq_long_factor, liq_short_factor = 1 - 1/leverage, 1 + 1/leverage
+    fee_mult, mtm_base, mtm_slope = 1 - fee_rate, 0.0, 0.0
+    for i in range(1, n):
+        current_price = close[i]
+        # 청산되면 자산이 0이 되고 이후 거래가 없으므로 남은 봉을 한 번에 채우고 종료
+        if position == POSITION_LONG and low[i] <= liquidation_price:
+            cash, position, liquidations = 0.0, POSITION_NONE, liquidations + 1; asset_history[i:] = cash; break
+        elif position == POSITION_SHORT and high[i] >= liquidation_price:
+            cash, position, liquidations = 0.0, POSITION_NONE, liquidations + 1; asset_history[i:] = cash; break
+        if position == POSITION_LONG and above_middle[i]:
+            pnl = _pnl_nb(entry_price, current_price, position_margin, leverage, POSITION_LONG)
+            cash = (position_margin + pnl) * fee_mult; cash = min(cash, MAX_ASSET_VALUE)
+            position, trades = POSITION_NONE, trades + 1
+        elif position == POSITION_SHORT and below_middle[i]:
+            pnl = _pnl_nb(entry_price, current_price, position_margin, leverage, POSITION_SHORT)
+            cash = (position_margin + pnl) * fee_mult; cash = min(cash, MAX_ASSET_VALUE)
+            position, trades = POSITION_NONE, trades + 1
+        if cash <= 0 and position == POSITION_NONE: asset_history[i:] = cash; break
+        if position == POSITION_NONE:
+            if below_lower[i]:
+                position_margin, entry_price, position, trades = cash, current_price, POSITION_LONG, trades + 1; liquidation_price = entry_price * liq_long_factor
+                mtm_base, mtm_slope = _mtm_coefficients(entry_price, position_margin, leverage, position)
+            elif above_upper[i]:
+                position_margin, entry_price, position, trades = cash, current_price, POSITION_SHORT, trades + 1; liquidation_price = entry_price * liq_short_factor
+                mtm_base, mtm_slope = _mtm_coefficients(entry_price, position_margin, leverage, position)
+        asset_history[i] = _asset_nb(current_price, mtm_base, mtm_slope, entry_price, position, cash)
+    return asset_history, trades, liquidations
+
+@njit(cache=True)
+def _adx_filtered_dual_loop(close, low, high, events, initial_cash, fee_rate, leverage, stop_loss_pct, take_profit_pct):
+    n = close.size
+    asset_history = np.empty(n); asset_history[0] = initial_cash
+    cash, trades, liquidations, position, entry_price, position_margin, stop_loss_price, take_profit_price, liquidation_price = initial_cash, 0, 0, POSITION_NONE, 0.0, 0.0, 0.0, 0.0, 0.0
+    # 청산가/손절가/익절가 = 진입가 x (1 ± 비율)이므로 비율은 루프 밖에서 한 번만 계산 (레버리지가 0 이하면 청산가에 닿지 않음)
+    liq_frac, stop_frac, take_frac = 1/leverage if leverage > 0 else np.inf, stop_loss_pct / 100, take_profit_pct / 100
+    use_stop_loss, use_take_profit = stop_loss_pct != 0, take_profit_pct != 0
+    fee_mult, mtm_base, mtm_slope = 1 - fee_rate, 0.0, 0.0
+    i = 1
+    while i < n:
+        if position != POSITION_NONE:
+            # 보유 중에는 청산/손절/익절 가격에 처음 닿는 봉까지 평가금액만 기록하고 건너뜀 (포지션은 가격으로만 종료됨)
+            if position == POSITION_LONG:
+                low_trigger = liquidation_price
+                if stop_loss_pct != 0: low_trigger = max(low_trigger, stop_loss_price)
+                high_trigger = take_profit_price if take_profit_pct != 0 else np.inf
+            else:
+                high_trigger = liquidation_price
+                if stop_loss_pct != 0: high_trigger = min(high_trigger, stop_loss_price)
+                low_trigger = take_profit_price if take_profit_pct != 0 else -np.inf
+            while i < n and low[i] > low_trigger and high[i] < high_trigger:
+                asset_history[i] = _asset_nb(close[i], mtm_base, mtm_slope, entry_price, position, cash); i += 1
+            if i == n: break
+        current_price = close[i]
+        if position != POSITION_NONE:
+            exit_price, is_liquidated = _exit_price_nb(position, low[i], high[i], liquidation_price, stop_loss_price, take_profit_price, use_stop_loss, use_take_profit)
+            if is_liquidated: liquidations += 1
+            if exit_price > 0:
+                pnl = _pnl_nb(entry_price, exit_price, position_margin, leverage, position)
+                cash = 0.0 if is_liquidated else (position_margin + pnl) * fee_mult; cash = min(cash, MAX_ASSET_VALUE)
+                position = POSITION_NONE
+        if position == POSITION_NONE:
+            # 현금이 없으면 더 이상 진입할 수 없으므로 남은 봉을 한 번에 채우고 종료
+            if cash <= 0: asset_history[i:] = cash; break
+            signal = events[i]
+            if signal != POSITION_NONE:
+                position_margin, entry_price, position, trades = cash, current_price, signal, trades + 1
+                mtm_base, mtm_slope = _mtm_coefficients(entry_price, position_margin, leverage, position)
+                liquidation_price, stop_price, take_price = _risk_prices_nb(entry_price, signal, liq_frac, stop_frac, take_frac)
+                if stop_loss_pct != 0: stop_loss_price, take_profit_price = stop_price, take_price
+        asset_history[i] = _asset_nb(current_price, mtm_base, mtm_slope, entry_price, position, cash)
+        i += 1
+    return asset_history, trades, liquidations
+
+@njit(cache=True)
+def _macd_filtered_loop(close, low, high, force_exit, events, initial_cash, fee_rate, leverage, stop_loss_pct, take_profit_pct, allow_short=True):
+    """
+    손절/익절/강제청산 + 신호 반대 방향 청산/진입 루프 (MACD 계열 전략 공용)
+    - force_exit[i]가 참인 봉(국면 필터에 걸린 봉)은 보유 포지션을 종가에 청산하고 신호를 무시합니다.
+    - allow_short가 거짓이면 숏 신호는 롱 포지션 청산에만 쓰고 숏 포지션에 진입하지 않습니다.
+    """
+    n = close.size
+    asset_history = np.empty(n); asset_history[0] = initial_cash
+    cash, trades, liquidations, position, entry_price, position_margin, stop_loss_price, take_profit_price, liquidation_price = initial_cash, 0, 0, POSITION_NONE, 0.0, 0.0, 0.0, 0.0, 0.0
+    # 청산가/손절가/익절가 = 진입가 x (1 ± 비율)이므로 비율은 루프 밖에서 한 번만 계산
+    # 레버리지 1배 이하는 강제청산이 없으므로 청산 비율을 inf로 두어 닿을 수 없는 가격(-inf/inf)을 청산가로 씀
+    liq_frac, stop_frac, take_frac = 1/leverage if leverage > 1 else np.inf, stop_loss_pct / 100, take_profit_pct / 100
+    use_stop_loss, use_take_profit = stop_loss_pct != 0, take_profit_pct != 0
+    fee_mult, mtm_base, mtm_slope = 1 - fee_rate, 0.0, 0.0
+    for i in range(1, n):
+        current_price = close[i]
+        if position != POSITION_NONE:
+            exit_price, is_liquidated = _exit_price_nb(position, low[i], high[i], liquidation_price, stop_loss_price, take_profit_price, use_stop_loss, use_take_profit)
+            if is_liquidated: liquidations += 1
+            if exit_price > 0:
+                pnl = _pnl_nb(entry_price, exit_price, position_margin, leverage, position)
+                cash = 0.0 if is_liquidated else (position_margin + pnl) * fee_mult; cash = min(cash, MAX_ASSET_VALUE)
+                position = POSITION_NONE
+        # 현금이 없고 포지션도 없으면 더 이상 거래가 없으므로 남은 봉을 한 번에 채우고 종료
+        if cash <= 0 and position == POSITION_NONE: asset_history[i:] = cash; break
+        if force_exit[i]:
+            if position != POSITION_NONE:
+                pnl = _pnl_nb(entry_price, current_price, position_margin, leverage, position)
+                cash = (position_margin + pnl) * fee_mult; cash = min(cash, MAX_ASSET_VALUE)
+                position, trades = POSITION_NONE, trades + 1
+        else:
+            signal = events[i]
+            # 반대 신호면 청산 후 같은 봉에서 신호 방향으로 진입
+            if position != POSITION_NONE and signal == -position:
+                pnl = _pnl_nb(entry_price, current_price, position_margin, leverage, position)
+                cash = (position_margin + pnl) * fee_mult; cash = min(cash, MAX_ASSET_VALUE)
+                position, trades = POSITION_NONE, trades + 1
+            if position == POSITION_NONE and cash > 0 and (signal == POSITION_LONG or (allow_short and signal == POSITION_SHORT)):
+                position_margin, entry_price, position, trades = cash, current_price, signal, trades + 1
+                mtm_base, mtm_slope = _mtm_coefficients(entry_price, position_margin, leverage, position)
+                liquidation_price, stop_price, take_price = _risk_prices_nb(entry_price, signal, liq_frac, stop_frac, take_frac)
+                if stop_loss_pct != 0: stop_loss_price, take_profit_price = stop_price, take_price
+        asset_history[i] = _asset_nb(current_price, mtm_base, mtm_slope, entry_price, position, cash)
+    return asset_history, trades, liquidations
+
+@njit(cache=True)
+def _momentum_spike_loop(open_prices, close, low, high, events, initial_cash, fee_rate, leverage, stop_loss_pct, take_profit_pct, capital_frac=1.0, min_order_size=0.0, fee_on_position=False, record_history=True):
+    """
+    급등/급락 신호가 나온 봉의 시가에 진입하고 손절/익절/강제청산으로만 빠져나가는 루프 (모멘텀 스캘핑 전략 4종 공용)
+    - 손절/익절/강제청산도 거래 횟수에 포함합니다.
+    - 자본의 capital_frac만 증거금으로 쓰고 나머지는 현금으로 보유하며, 평가금액은 보유 현금 + 포지션 가치입니다.
+    - 진입 수량(증거금 x 레버리지 / 시가)이 min_order_size보다 작으면 진입하지 않습니다.
+    - fee_on_position이면 포지션 규모 기준 수수료(진입+청산 2회분)를 빼고, 아니면 청산 금액에 fee_rate를 적용합니다.
+    - 최대 낙폭(비율)은 봉마다 함께 갱신해서 반환합니다. record_history가 거짓이면 봉별 자산을 저장하지 않고 마지막 자산만 담은 길이 1 배열을 반환합니다. (파라미터 탐색용)
+    """
+    n = close.size
+    asset_history = np.empty(n if record_history else 1); asset_history[0] = initial_cash
+    peak, max_drawdown = _drawdown_step(initial_cash, -np.inf, np.nan)
+    cash, trades, liquidations, position, entry_price, position_margin, stop_loss_price, take_profit_price, liquidation_price = initial_cash, 0, 0, POSITION_NONE, 0.0, 0.0, 0.0, 0.0, 0.0
+    # 청산가/손절가/익절가 = 진입가 x (1 ± 비율)이므로 비율은 루프 밖에서 한 번만 계산
+    # 레버리지 1배 이하는 강제청산이 없으므로 청산 비율을 inf로 두어 닿을 수 없는 가격(-inf/inf)을 청산가로 씀
+    liq_frac, stop_frac, take_frac = 1/leverage if leverage > 1 else np.inf, stop_loss_pct / 100, take_profit_pct / 100
+    # 포지션 규모 기준 수수료율(진입+청산 2회분)도 청산마다 다시 곱하지 않도록 미리 계산
+    fee_mult, position_fee_rate, mtm_base, mtm_slope = 1 - fee_rate, leverage * fee_rate * 2, 0.0, 0.0
+    for i in range(1, n):
+        if position != POSITION_NONE:
+            exit_price, is_liquidated = _exit_price_nb(position, low[i], high[i], liquidation_price, stop_loss_price, take_profit_price, True, True)
+            if is_liquidated: liquidations += 1
+            if exit_price > 0:
+                # 청산 시에는 증거금을 모두 잃으므로 남겨둔 현금만 남음
+                if not is_liquidated:
+                    pnl = _pnl_nb(entry_price, exit_price, position_margin, leverage, position)
+                    if fee_on_position: cash += (position_margin + pnl) - position_margin * position_fee_rate
+                    else: cash += (position_margin + pnl) * fee_mult
+                cash = min(cash, MAX_ASSET_VALUE)
+                position, position_margin, trades = POSITION_NONE, 0.0, trades + 1
+        # 현금이 없고 포지션도 없으면 더 이상 진입할 수 없으므로 남은 봉을 한 번에 채우고 종료
+        if cash <= 0 and position == POSITION_NONE:
+            asset_history[i if record_history else 0:] = cash; peak, max_drawdown = _drawdown_step(cash, peak, max_drawdown); break
+        signal = events[i]
+        if position == POSITION_NONE and cash > 0 and signal != POSITION_NONE:
+            margin, entry_candidate = cash * capital_frac, open_prices[i]
+            if entry_candidate > 0 and (margin * leverage) / entry_candidate >= min_order_size:
+                position_margin, entry_price, position, trades = margin, entry_candidate, signal, trades + 1; cash -= margin
+                mtm_base, mtm_slope = _mtm_coefficients(entry_price, position_margin, leverage, position)
+                liquidation_price, stop_loss_price, take_profit_price = _risk_prices_nb(entry_price, signal, liq_frac, stop_frac, take_frac)
+        asset = cash + _asset_nb(close[i], mtm_base, mtm_slope, entry_price, position, 0.0)
+        asset_history[i if record_history else 0] = asset; peak, max_drawdown = _drawdown_step(asset, peak, max_drawdown)
+    return asset_history, trades, liquidations, max_drawdown
+
+@njit(cache=True, parallel=True)
+def _signal_leverage_batch(close, low, high, events, starts, initial_cash, fee_rate, leverage):
+    """
+    파라미터 조합마다(events의 각 행) _signal_leverage_loop를 실행해 조합별 최종 자산/MDD(%)/거래/청산 횟수를 반환
+    - events는 (조합 수, 봉 수) 모양이라 조합 하나의 신호가 메모리에 연속으로 놓임, starts는 조합별 예열이 끝나는 봉 위치
+    - 조합끼리는 독립적이므로 prange로 나눠서 실행 (자산 기록은 조합마다 만들었다가 바로 버림)
+    """
+    n_params = events.shape[0]
+    final_assets, mdds = np.empty(n_params), np.empty(n_params)
+    trades, liquidations = np.zeros(n_params, dtype=np.int64), np.zeros(n_params, dtype=np.int64)
+    for k in prange(n_params):
+        start = starts[k]
+        if start >= close.size:
+            final_assets[k], mdds[k] = initial_cash, 0.0; continue
+        asset_history, trades[k], liquidations[k] = _signal_leverage_loop(close[start:], low[start:], high[start:], events[k, start:], initial_cash, fee_rate, leverage)
+        final_assets[k], mdds[k] = asset_history[-1], _max_drawdown_nb(asset_history) * 100
+    return final_assets, mdds, trades, liquidations
+
+@njit(cache=True, parallel=True)
+def _momentum_spike_batch(open_prices, close, low, high, grid, initial_cash, fee_rate, leverage, capital_frac, fee_on_position):
+    """
+    파라미터 조합마다(grid의 각 행 = 급등 기준, 익절, 손절, 최소 주문량) _momentum_spike_loop를 실행해 조합별 최종 자산/MDD(%)/거래/청산 횟수를 반환
+    - 조합끼리는 독립적이므로 prange로 나눠서 실행 (신호는 조합마다 만들었다가 바로 버리고, 자산 기록은 만들지 않음)
+    """
+    n_params = grid.shape[0]
+    final_assets, mdds = np.empty(n_params), np.empty(n_params)
+    trades, liquidations = np.zeros(n_params, dtype=np.int64), np.zeros(n_params, dtype=np.int64)
+    for k in prange(n_params):
+        spike_pct, take_profit_pct, stop_loss_pct, min_order_size = grid[k, 0], grid[k, 1], grid[k, 2], grid[k, 3]
+        events = _spike_events_nb(open_prices, close, spike_pct, -spike_pct)
+        # 요약 지표만 필요하므로 봉별 자산은 저장하지 않음 (최대 낙폭은 루프 안에서 갱신)
+        last_asset, trades[k], liquidations[k], max_drawdown = _momentum_spike_loop(
+            open_prices, close, low, high, events, initial_cash, fee_rate, leverage, stop_loss_pct, take_profit_pct, capital_frac, min_order_size, fee_on_position, False)
+        final_assets[k], mdds[k] = last_asset[0], max_drawdown * 100
+    return final_assets, mdds, trades, liquidations
+
+def warmup_kernels():
+    """
+    njit 커널을 작은 입력으로 한 번씩 실행해 컴파일을 미리 끝냅니다. (cache=True이므로 이후에는 디스크 캐시를 읽기만 함)
+    - 프로세스 풀을 띄우기 전에 호출하면, 작업 프로세스들이 동시에 같은 커널을 컴파일하지 않고 캐시를 불러옵니다.
+    - 실제 전략과 같은 타입(float64/bool/int8 배열, 정수 기간)으로 호출해야 같은 컴파일 결과가 재사용됩니다.
+    """
+    values, flags, events = np.linspace(1.0, 2.0, 4), np.zeros(4, dtype=np.bool_), np.zeros(4, dtype=np.int8)
+    _max_drawdown_nb(values)
+    # 캐시된 지표는 읽기 전용 배열이라 numba가 따로 컴파일하므로 읽기 전용 입력으로도 한 번 호출
+    readonly = values.copy(); readonly.flags.writeable = False
+    _first_valid_nb(values); _first_valid_nb(readonly)
+    _spike_events_nb(values, values, 1.0, -1.0)
+    _rolling_mean_nb(values, 2); _rolling_std_nb(values, 2, 1); _ewm_mean_nb(values, 1.0, True, 2)
+    _adx_rsi_ema_nb(values, values, values, 1.0, 2, 1.0, 2, 0.5, 1.0)
+    _adx_nb(values, values, values, 1.0, 2)
+    _macd_trend_nb(values, 1.0, 2.0, 0.5, 3.0)
+    _ma_crossover_loop(values, flags, flags, 100.0, 0.001); _ma_crossover_loop(values, flags, flags, 100.0, 0.001, True)
+    _signal_leverage_loop(values, values, values, events, 100.0, 0.001, 2.0)
+    _signal_leverage_batch(values, values, values, events.reshape(1, -1), np.zeros(1, dtype=np.int64), 100.0, 0.001, 2.0)
+    _bollinger_band_leverage_loop(values, values, values, flags, flags, flags, flags, 100.0, 0.001, 2.0)
+    _adx_filtered_dual_loop(values, values, values, events, 100.0, 0.001, 2.0, -1.5, 3.0)
+    _macd_filtered_loop(values, values, values, flags, events, 100.0, 0.001, 2.0, -1.5, 3.0)
+    _macd_filtered_loop(values, values, values, flags, events, 100.0, 0.001, 2.0, -1.5, 3.0, False)
+    _momentum_spike_loop(values, values, values, values, events, 100.0, 0.001, 2.0, -1.0, 1.0, 0.5, 0.001, True)
+    _momentum_spike_loop(values, values, values, values, events, 100.0, 0.001, 2.0, -1.0, 1.0, 0.5, 0.001, True, False)
+    _momentum_spike_batch(values, values, values, values, np.array([[1.0, 1.0, -1.0, 0.001]]), 100.0, 0.001, 2.0, 0.5, True)
+
+# ==============================================================================
+# 지표 캐시 (파라미터 탐색에서 같은 가격 데이터에 같은 지표를 다시 계산하지 않도록)
+# ==============================================================================
+
+_INDICATOR_CACHE = OrderedDict()
+_INDICATOR_CACHE_SIZE = 64
+
+def _indicator_key(func, arrays, args):
+    return (func, tuple((a.__array_interface__['data'][0], a.shape, a.strides, a.dtype.str) for a in arrays), args)
+
+def _store_indicator(key, arrays, result):
+    """계산 결과를 읽기 전용으로 만들어 캐시에 저장 (오래된 항목부터 제거)"""
+    for out in (result if isinstance(result, tuple) else (result,)): out.flags.writeable = False
+    _INDICATOR_CACHE[key] = (arrays, result)
+    if len(_INDICATOR_CACHE) > _INDICATOR_CACHE_SIZE: _INDICATOR_CACHE.popitem(last=False)
+    return result
+
+def _cached_indicator(func, arrays, *args):
+    """
+    func(*arrays, *args)의 결과를 캐시해서 반환합니다.
+    - 입력 배열의 메모리 위치/모양이 같고 인자가 같으면 다시 계산하지 않습니다. (가격 데이터는 수정하지 않는다는 전제)
+    - 캐시 항목이 입력 배열을 참조하므로, 항목이 남아 있는 동안 같은 메모리가 다른 데이터에 재사용되지 않습니다.
+    - 반환 배열은 캐시와 공유되므로 읽기 전용입니다.
+    """
+    key = _indicator_key(func, arrays, args)
+    entry = _INDICATOR_CACHE.get(key)
+    if entry is not None:
+        _INDICATOR_CACHE.move_to_end(key); return entry[1]
+    return _store_indicator(key, arrays, func(*arrays, *args))
+
+def _span_to_com(span):
+    """span을 pandas와 같은 방식으로 com으로 변환 (alpha = 2 / (span + 1), pandas처럼 span < 1이면 ValueError)"""
+    if span < 1: raise ValueError("span must satisfy: span >= 1")
+    return (span - 1) / 2.
+
+def _ewm_span_values(values, span):
+    """Series.ewm(span=span, adjust=False).mean()과 같은 값을 njit 커널로 계산해 넘파이 배열로 반환"""
+    return _ewm_mean_nb(np.asarray(values, dtype=np.float64), _span_to_com(span), False, 0)
+
+def _macd_values(close, fast_ma_len, slow_ma_len, signal_len):
+    """MACD선(단기 EMA - 장기 EMA)과 신호선(MACD의 EMA)을 반환"""
+    # 단기/장기 EMA는 캐시에서 가져와 신호선 기간만 다른 조합이나 같은 기간의 추세 EMA와 공유
+    macd = _ewm_span(close, fast_ma_len) - _ewm_span(close, slow_ma_len)
+    return macd, _ewm_span_values(macd, signal_len)
+
+def _ewm_span(values, span):
+    """Series.ewm(span=span, adjust=False).mean()과 같은 값을 넘파이 배열로 반환 (캐시 사용, 읽기 전용)"""
+    return _cached_indicator(_ewm_span_values, (np.asarray(values, dtype=np.float64),), span)
+
+def _macd(values, fast_ma_len, slow_ma_len, signal_len):
+    """(MACD선, 신호선)을 넘파이 배열로 반환 (캐시 사용, 읽기 전용 / 같은 기간 조합이면 신호선까지 다시 계산하지 않음)"""
+    return _cached_indicator(_macd_values, (np.asarray(values, dtype=np.float64),), fast_ma_len, slow_ma_len, signal_len)
+
+def _macd_trend(values, fast_ma_len, slow_ma_len, signal_len, trend_ma_len):
+    """(MACD선, 신호선, 추세 EMA)를 한 번 순회로 계산해 넘파이 배열로 반환 (캐시 사용, 읽기 전용)"""
+    close = np.asarray(values, dtype=np.float64); arrays = (close,)
+    macd_key = _indicator_key(_macd_values, arrays, (fast_ma_len, slow_ma_len, signal_len))
+    trend_key = _indicator_key(_ewm_span_values, arrays, (trend_ma_len,))
+    if macd_key in _INDICATOR_CACHE and trend_key in _INDICATOR_CACHE:
+        # 다른 MACD 전략이 이미 계산한 MACD/신호선과 추세 EMA를 그대로 사용
+        return (*_macd(close, fast_ma_len, slow_ma_len, signal_len), _ewm_span(close, trend_ma_len))
+    coms = tuple(_span_to_com(span) for span in (fast_ma_len, slow_ma_len, signal_len, trend_ma_len))
+    macd, macd_signal, trend_ma = _cached_indicator(_macd_trend_nb, arrays, *coms)
+    # 계산 결과를 _macd/_ewm_span 캐시에도 등록해서 관련 MACD 전략들이 다시 계산하지 않도록 함
+    if macd_key not in _INDICATOR_CACHE: _store_indicator(macd_key, arrays, (macd, macd_signal))
+    if trend_key not in _INDICATOR_CACHE: _store_indicator(trend_key, arrays, trend_ma)
+    return macd, macd_signal, trend_ma
+
+def _adx_values(high, low, close, period):
+    """calculate_adx의 ADX 값을 njit 커널로 계산해 넘파이 배열로 반환 (중간 데이터프레임/컬럼을 만들지 않음)"""
+    # alpha=1/period를 pandas와 같은 방식으로 com으로 변환
+    return _adx_nb(high, low, close, (1 - 1/period) / (1/period), period)
+
+def _rsi_values(close, period):
+    """calculate_rsi 결과를 봉 개수만큼의 배열로 반환 (상수 100.0이 반환되는 경우도 펼침)"""
+    return np.broadcast_to(np.asarray(calculate_rsi(pd.Series(close), period=period), dtype=np.float64), close.shape).copy()
+
 # ==============================================================================
 # 전략 함수들 (공통 로직 수정)
 # ==============================================================================
@@ -62,221 +794,127 @@ def _calculate_asset(entry_price, current_price, position_margin, leverage, posi
 
 def ma_crossover_strategy(params, df, initial_cash, fee_rate, leverage=1):
     short_ma_period = params.get('short_ma', 20); long_ma_period = params.get('long_ma', 60)
-    df['MA_short'] = df['Close'].rolling(window=short_ma_period).mean(); df['MA_long'] = df['Close'].rolling(window=long_ma_period).mean(); df.dropna(inplace=True)
-    cash, coins, trades, asset_history = initial_cash, 0, 0, []
-    for i in range(1, len(df)):
-        if df['MA_short'].iloc[i-1] <= df['MA_long'].iloc[i-1] and df['MA_short'].iloc[i] > df['MA_long'].iloc[i] and cash > 0:
-            coins = (cash / df['Close'].iloc[i]) * (1 - fee_rate); cash = 0; trades += 1
-        elif df['MA_short'].iloc[i-1] >= df['MA_long'].iloc[i-1] and df['MA_short'].iloc[i] < df['MA_long'].iloc[i] and coins > 0:
-            cash = (coins * df['Close'].iloc[i]) * (1 - fee_rate); coins = 0; trades += 1
-        asset_history.append(cash + coins * df['Close'].iloc[i])
-    final_asset = asset_history[-1] if asset_history else initial_cash
+    close = df['Close'].to_numpy(dtype=np.float64)
+    ma_short = _rolling_mean(close, short_ma_period); ma_long = _rolling_mean(close, long_ma_period)
+    start = _warmup_length(ma_short, ma_long)
+    cross_up, cross_down = _crossovers(ma_short[start:], ma_long[start:])
+    asset_history, trades = _ma_crossover_loop(close[start:], cross_up, cross_down, float(initial_cash), float(fee_rate))
+    final_asset = asset_history[-1] if len(asset_history) else initial_cash
     total_return = (final_asset / initial_cash - 1) * 100
-    asset_series = pd.Series(asset_history); mdd = (1 - (asset_series / asset_series.cummax())).max() * 100
+    mdd = _max_drawdown_pct(asset_history)
     return {'total_return_pct': total_return, 'mdd_pct': -mdd, 'total_trades': trades, 'asset_history': asset_history}
 
 def ma_crossover_leverage_strategy(params, df, initial_cash, fee_rate, leverage):
     short_ma_period=params.get('short_ma', 20); long_ma_period=params.get('long_ma', 60)
-    df['MA_short'] = df['Close'].rolling(window=short_ma_period).mean(); df['MA_long'] = df['Close'].rolling(window=long_ma_period).mean(); df.dropna(inplace=True)
-    if df.empty: return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
-    cash = initial_cash; asset_history = [initial_cash]
-    trades, liquidations, position_status, entry_price, position_margin, liquidation_price = 0, 0, 'none', 0, 0, 0
-    for i in range(1, len(df)):
-        current_price = df['Close'].iloc[i]
-        if position_status == 'long' and df['Low'].iloc[i] <= liquidation_price:
-            cash, position_status, liquidations = 0, 'none', liquidations + 1; asset_history.append(cash); continue
-        elif position_status == 'short' and df['High'].iloc[i] >= liquidation_price:
-            cash, position_status, liquidations = 0, 'none', liquidations + 1; asset_history.append(cash); continue
-        if cash <= 0: asset_history.append(cash); continue
-        is_golden_cross = df['MA_short'].iloc[i-1] <= df['MA_long'].iloc[i-1] and df['MA_short'].iloc[i] > df['MA_long'].iloc[i]
-        is_dead_cross = df['MA_short'].iloc[i-1] >= df['MA_long'].iloc[i-1] and df['MA_short'].iloc[i] < df['MA_long'].iloc[i]
-        if is_golden_cross:
-            if position_status == 'short':
-                pnl = _calculate_pnl(entry_price, current_price, position_margin, leverage, 'short')
-                cash = (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE)
-                position_status, trades = 'none', trades + 1
-            if position_status == 'none':
-                position_margin, entry_price, position_status, trades = cash, current_price, 'long', trades + 1; liquidation_price = entry_price * (1 - 1/leverage)
-        elif is_dead_cross:
-            if position_status == 'long':
-                pnl = _calculate_pnl(entry_price, current_price, position_margin, leverage, 'long')
-                cash = (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE)
-                position_status, trades = 'none', trades + 1
-            if position_status == 'none':
-                position_margin, entry_price, position_status, trades = cash, current_price, 'short', trades + 1; liquidation_price = entry_price * (1 + 1/leverage)
-        current_asset = _calculate_asset(entry_price, current_price, position_margin, leverage, position_status, cash)
-        asset_history.append(current_asset)
-    final_asset = asset_history[-1] if asset_history else initial_cash; total_return = (final_asset / initial_cash - 1) * 100
-    asset_series = pd.Series(asset_history); mdd = (1 - (asset_series / asset_series.cummax())).max() * 100
+    close, low, high = df['Close'].to_numpy(dtype=np.float64), df['Low'].to_numpy(dtype=np.float64), df['High'].to_numpy(dtype=np.float64)
+    ma_short = _rolling_mean(close, short_ma_period); ma_long = _rolling_mean(close, long_ma_period)
+    start = _warmup_length(ma_short, ma_long)
+    if start >= len(df): return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
+    is_golden_cross, is_dead_cross = _crossovers(ma_short[start:], ma_long[start:])
+    asset_history, trades, liquidations = _signal_leverage_loop(
+        close[start:], low[start:], high[start:], _signal_events(is_golden_cross, is_dead_cross), float(initial_cash), float(fee_rate), float(leverage))
+    final_asset = asset_history[-1] if len(asset_history) else initial_cash; total_return = (final_asset / initial_cash - 1) * 100
+    mdd = _max_drawdown_pct(asset_history)
     return {'total_return_pct': total_return, 'mdd_pct': -mdd, 'total_trades': trades, 'total_liquidations': liquidations, 'asset_history': asset_history}
 
+def ma_crossover_leverage_batch(param_list, df, initial_cash, fee_rate, leverage):
+    """
+    ma_crossover_leverage_strategy를 여러 파라미터 조합으로 한 번에 실행합니다. (파라미터 탐색용)
+    - 이동평균은 기간별로 한 번만 계산하고, 조합별 신호를 (조합 수, 봉 수) 배열로 만들어 커널 하나에서 모두 실행합니다.
+    - 결과는 지표별 배열(param_list 순서) 딕셔너리이며, 값은 조합마다 ma_crossover_leverage_strategy를 실행한 것과 같습니다.
+    """
+    periods = [(params.get('short_ma', 20), params.get('long_ma', 60)) for params in param_list]
+    # 가격 컬럼은 한 번만 넘파이 배열로 꺼내 지표 계산과 백테스트 루프에 함께 사용
+    close, low, high = df['Close'].to_numpy(dtype=np.float64), df['Low'].to_numpy(dtype=np.float64), df['High'].to_numpy(dtype=np.float64)
+    moving_averages = {period: _rolling_mean(close, period) for period in {p for pair in periods for p in pair}}
+    events, starts = np.empty((len(periods), len(df)), dtype=np.int8), np.empty(len(periods), dtype=np.int64)
+    for k, (short_ma_period, long_ma_period) in enumerate(periods):
+        ma_short, ma_long = moving_averages[short_ma_period], moving_averages[long_ma_period]
+        # 예열 구간에서는 이동평균이 NaN이라 비교가 모두 거짓이므로 전체 구간으로 계산해도 예열 이후 신호는 같음
+        starts[k] = _warmup_length(ma_short, ma_long); events[k] = _signal_events(*_crossovers(ma_short, ma_long))
+    final_assets, mdds, trades, liquidations = _signal_leverage_batch(
+        close, low, high, events, starts, float(initial_cash), float(fee_rate), float(leverage))
+    return {'total_return_pct': (final_assets / initial_cash - 1) * 100, 'mdd_pct': -mdds, 'total_trades': trades, 'total_liquidations': liquidations}
+
 def rsi_leverage_strategy(params, df, initial_cash, fee_rate, leverage):
     rsi_period=params.get('rsi_period', 14); oversold_threshold=params.get('oversold_threshold', 30); overbought_threshold=params.get('overbought_threshold', 70)
-    df['RSI'] = calculate_rsi(df['Close'], period=rsi_period); df.dropna(inplace=True)
-    if df.empty: return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
-    cash = initial_cash; asset_history = [initial_cash]
-    trades, liquidations, position_status, entry_price, position_margin, liquidation_price = 0, 0, 'none', 0, 0, 0
-    for i in range(1, len(df)):
-        current_price = df['Close'].iloc[i]
-        if position_status == 'long' and df['Low'].iloc[i] <= liquidation_price:
-            cash, position_status, liquidations = 0, 'none', liquidations + 1; asset_history.append(cash); continue
-        elif position_status == 'short' and df['High'].iloc[i] >= liquidation_price:
-            cash, position_status, liquidations = 0, 'none', liquidations + 1; asset_history.append(cash); continue
-        if cash <= 0: asset_history.append(cash); continue
-        is_buy_signal = df['RSI'].iloc[i-1] < oversold_threshold and df['RSI'].iloc[i] >= oversold_threshold
-        is_sell_signal = df['RSI'].iloc[i-1] > overbought_threshold and df['RSI'].iloc[i] <= overbought_threshold
-        if is_buy_signal:
-            if position_status == 'short':
-                pnl = _calculate_pnl(entry_price, current_price, position_margin, leverage, 'short')
-                cash = (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE)
-                position_status, trades = 'none', trades + 1
-            if position_status == 'none':
-                position_margin, entry_price, position_status, trades = cash, current_price, 'long', trades + 1; liquidation_price = entry_price * (1 - 1/leverage)
-        elif is_sell_signal:
-            if position_status == 'long':
-                pnl = _calculate_pnl(entry_price, current_price, position_margin, leverage, 'long')
-                cash = (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE)
-                position_status, trades = 'none', trades + 1
-            if position_status == 'none':
-                position_margin, entry_price, position_status, trades = cash, current_price, 'short', trades + 1; liquidation_price = entry_price * (1 + 1/leverage)
-        current_asset = _calculate_asset(entry_price, current_price, position_margin, leverage, position_status, cash)
-        asset_history.append(current_asset)
-    final_asset = asset_history[-1] if asset_history else initial_cash; total_return = (final_asset / initial_cash - 1) * 100
-    asset_series = pd.Series(asset_history); mdd = (1 - (asset_series / asset_series.cummax())).max() * 100
+    close, low, high = df['Close'].to_numpy(dtype=np.float64), df['Low'].to_numpy(dtype=np.float64), df['High'].to_numpy(dtype=np.float64)
+    rsi = _cached_indicator(_rsi_values, (close,), rsi_period)
+    start = _warmup_length(rsi)
+    if start >= len(df): return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
+    is_buy_signal, is_sell_signal = _threshold_crosses(rsi[start:], oversold_threshold, overbought_threshold)
+    asset_history, trades, liquidations = _signal_leverage_loop(
+        close[start:], low[start:], high[start:], _signal_events(is_buy_signal, is_sell_signal), float(initial_cash), float(fee_rate), float(leverage))
+    final_asset = asset_history[-1] if len(asset_history) else initial_cash; total_return = (final_asset / initial_cash - 1) * 100
+    mdd = _max_drawdown_pct(asset_history)
     return {'total_return_pct': total_return, 'mdd_pct': -mdd, 'total_trades': trades, 'total_liquidations': liquidations, 'asset_history': asset_history}
 
 def bollinger_band_leverage_strategy(params, df, initial_cash, fee_rate, leverage):
     bb_length=params.get('bb_length', 20); bb_std=params.get('bb_std', 2);
-    df = calculate_bbands(df, length=bb_length, std_dev=bb_std); df.dropna(inplace=True)
-    if df.empty: return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
-    cash = initial_cash; asset_history = [initial_cash]
-    trades, liquidations, position_status, entry_price, position_margin, liquidation_price = 0, 0, 'none', 0, 0, 0
-    for i in range(1, len(df)):
-        current_price = df['Close'].iloc[i]
-        if position_status == 'long' and df['Low'].iloc[i] <= liquidation_price:
-            cash, position_status, liquidations = 0, 'none', liquidations + 1; asset_history.append(cash); continue
-        elif position_status == 'short' and df['High'].iloc[i] >= liquidation_price:
-            cash, position_status, liquidations = 0, 'none', liquidations + 1; asset_history.append(cash); continue
-        if position_status == 'long' and current_price >= df['BBM'].iloc[i]:
-            pnl = _calculate_pnl(entry_price, current_price, position_margin, leverage, 'long')
-            cash = (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE)
-            position_status, trades = 'none', trades + 1
-        elif position_status == 'short' and current_price <= df['BBM'].iloc[i]:
-            pnl = _calculate_pnl(entry_price, current_price, position_margin, leverage, 'short')
-            cash = (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE)
-            position_status, trades = 'none', trades + 1
-        if cash <= 0 and position_status == 'none': asset_history.append(cash); continue
-        if position_status == 'none':
-            if current_price < df['BBL'].iloc[i]:
-                position_margin, entry_price, position_status, trades = cash, current_price, 'long', trades + 1; liquidation_price = entry_price * (1 - 1/leverage)
-            elif current_price > df['BBU'].iloc[i]:
-                position_margin, entry_price, position_status, trades = cash, current_price, 'short', trades + 1; liquidation_price = entry_price * (1 + 1/leverage)
-        current_asset = _calculate_asset(entry_price, current_price, position_margin, leverage, position_status, cash)
-        asset_history.append(current_asset)
-    final_asset = asset_history[-1] if asset_history else initial_cash; total_return = (final_asset / initial_cash - 1) * 100
-    asset_series = pd.Series(asset_history); mdd = (1 - (asset_series / asset_series.cummax())).max() * 100
+    # calculate_bbands와 같은 계산이지만 df에 컬럼을 추가하지 않음
+    close, low, high = df['Close'].to_numpy(dtype=np.float64), df['Low'].to_numpy(dtype=np.float64), df['High'].to_numpy(dtype=np.float64)
+    bbm = _rolling_mean(close, bb_length); std = _rolling_std(close, bb_length)
+    bbu, bbl = bbm + (std * bb_std), bbm - (std * bb_std)
+    start = _warmup_length(bbm, bbu, bbl)
+    if start >= len(df): return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
+    close, bbm, bbu, bbl = close[start:], bbm[start:], bbu[start:], bbl[start:]
+    asset_history, trades, liquidations = _bollinger_band_leverage_loop(
+        close, low[start:], high[start:], close >= bbm, close <= bbm, close < bbl, close > bbu,
+        float(initial_cash), float(fee_rate), float(leverage))
+    final_asset = asset_history[-1] if len(asset_history) else initial_cash; total_return = (final_asset / initial_cash - 1) * 100
+    mdd = _max_drawdown_pct(asset_history)
     return {'total_return_pct': total_return, 'mdd_pct': -mdd, 'total_trades': trades, 'total_liquidations': liquidations, 'asset_history': asset_history}
 
 def adx_filtered_dual_strategy(params, df, initial_cash, fee_rate, leverage):
     adx_period=params.get('adx_period',14); adx_threshold=params.get('adx_threshold',25); rsi_period=params.get('rsi_period',14); oversold_threshold=params.get('oversold_threshold',30); overbought_threshold=params.get('overbought_threshold',70); ema_short_period=params.get('ema_short_period',12); ema_long_period=params.get('ema_long_period',26); stop_loss_pct=params.get('stop_loss_pct',-1.5); take_profit_pct=params.get('take_profit_pct',3.0)
-    df = calculate_adx(df, period=adx_period); df['RSI'] = calculate_rsi(df['Close'], period=rsi_period); df['EMA_short'] = df['Close'].ewm(span=ema_short_period, adjust=False).mean(); df['EMA_long'] = df['Close'].ewm(span=ema_long_period, adjust=False).mean(); df.dropna(inplace=True)
-    if df.empty: return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
-    cash = initial_cash; asset_history = [initial_cash]
-    trades, liquidations, position_status, entry_price, position_margin, stop_loss_price, take_profit_price = 0, 0, 'none', 0, 0, 0, 0
-    for i in range(1, len(df)):
-        current_price = df['Close'].iloc[i]
-        if position_status != 'none':
-            exit_price, pnl, is_liquidated = 0, 0, False
-            if position_status == 'long':
-                liquidation_price = entry_price * (1 - 1/leverage) if leverage > 0 else 0
-                if df['Low'].iloc[i] <= liquidation_price: exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif stop_loss_pct != 0 and df['Low'].iloc[i] <= stop_loss_price: exit_price = stop_loss_price
-                elif take_profit_pct != 0 and df['High'].iloc[i] >= take_profit_price: exit_price = take_profit_price
-                if exit_price > 0: pnl = _calculate_pnl(entry_price, exit_price, position_margin, leverage, 'long')
-            elif position_status == 'short':
-                liquidation_price = entry_price * (1 + 1/leverage) if leverage > 0 else float('inf')
-                if df['High'].iloc[i] >= liquidation_price: exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif stop_loss_pct != 0 and df['High'].iloc[i] >= stop_loss_price: exit_price = stop_loss_price
-                elif take_profit_pct != 0 and df['Low'].iloc[i] <= take_profit_price: exit_price = take_profit_price
-                if exit_price > 0: pnl = _calculate_pnl(entry_price, exit_price, position_margin, leverage, 'short')
-            if exit_price > 0:
-                cash = 0 if is_liquidated else (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE)
-                position_status = 'none'
-        if position_status == 'none':
-            if cash <= 0: asset_history.append(cash); continue
-            is_trending_market = df['ADX'].iloc[i] > adx_threshold; signal = 'none'
-            if is_trending_market:
-                if df['EMA_short'].iloc[i-1]<=df['EMA_long'].iloc[i-1] and df['EMA_short'].iloc[i]>df['EMA_long'].iloc[i]: signal = 'long'
-                elif df['EMA_short'].iloc[i-1]>=df['EMA_long'].iloc[i-1] and df['EMA_short'].iloc[i]<df['EMA_long'].iloc[i]: signal = 'short'
-            else:
-                if df['RSI'].iloc[i-1]<oversold_threshold and df['RSI'].iloc[i]>=oversold_threshold: signal = 'long'
-                elif df['RSI'].iloc[i-1]>overbought_threshold and df['RSI'].iloc[i]<=overbought_threshold: signal = 'short'
-            if signal != 'none':
-                position_margin, entry_price, position_status, trades = cash, current_price, signal, trades + 1
-                if stop_loss_pct != 0:
-                    if signal == 'long': stop_loss_price = entry_price * (1 + stop_loss_pct / 100); take_profit_price = entry_price * (1 + take_profit_pct / 100)
-                    else: stop_loss_price = entry_price * (1 - stop_loss_pct / 100); take_profit_price = entry_price * (1 - take_profit_pct / 100)
-        current_asset = _calculate_asset(entry_price, current_price, position_margin, leverage, position_status, cash)
-        asset_history.append(current_asset)
-    final_asset = asset_history[-1] if asset_history else initial_cash; total_return = (final_asset / initial_cash - 1) * 100
-    asset_series = pd.Series(asset_history); mdd = (1 - (asset_series / asset_series.cummax())).max() * 100
+    close, low, high = df['Close'].to_numpy(dtype=np.float64), df['Low'].to_numpy(dtype=np.float64), df['High'].to_numpy(dtype=np.float64)
+    # 지표는 한 번의 순회로 계산 (com은 pandas ewm의 alpha/span 변환식과 동일)
+    adx, rsi, ema_short, ema_long = _cached_indicator(
+        _adx_rsi_ema_nb, (high, low, close),
+        (1 - 1/adx_period) / (1/adx_period), adx_period, float(rsi_period - 1), rsi_period, (ema_short_period - 1) / 2, (ema_long_period - 1) / 2)
+    start = _warmup_length(adx, rsi, ema_short, ema_long)
+    if start >= len(df): return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
+    # 추세장(ADX > 기준)에서는 EMA 크로스, 횡보장에서는 RSI 신호를 쓰도록 봉마다 미리 골라 int8 코드 하나로 합침 (커널은 이 배열만 읽음)
+    is_trending_market = adx[start:] > adx_threshold
+    trend_events = _signal_events(*_crossovers(ema_short[start:], ema_long[start:]))
+    range_events = _signal_events(*_threshold_crosses(rsi[start:], oversold_threshold, overbought_threshold))
+    asset_history, trades, liquidations = _adx_filtered_dual_loop(
+        close[start:], low[start:], high[start:], np.where(is_trending_market, trend_events, range_events),
+        float(initial_cash), float(fee_rate), float(leverage), float(stop_loss_pct), float(take_profit_pct))
+    final_asset = asset_history[-1] if len(asset_history) else initial_cash; total_return = (final_asset / initial_cash - 1) * 100
+    mdd = _max_drawdown_pct(asset_history)
     return {'total_return_pct': total_return, 'mdd_pct': -mdd, 'total_trades': trades, 'total_liquidations': liquidations, 'asset_history': asset_history}
 
 def macd_liquidity_tracker(params, df, initial_cash, fee_rate, leverage):
     system_type = params.get('system_type', 'Normal')
-    if isinstance(system_type, int): system_type = {0: 'Normal', 1: 'Fast', 2: 'Safe', 3: 'Crossover'}.get(system_type, 'Normal')
+    # 정수 코드는 그대로 쓰고(범위 밖이면 Normal), 알 수 없는 문자열이면 신호 없음
+    if isinstance(system_type, int): system = system_type if system_type in _SYSTEM_TYPES.values() else SYSTEM_NORMAL
+    else: system = _SYSTEM_TYPES.get(system_type, SYSTEM_UNKNOWN)
     fast_ma_len=params.get('fast_ma',12); slow_ma_len=params.get('slow_ma',26); signal_len=params.get('signal_ma',9); use_trend_filter=params.get('use_trend_filter',True); trend_ma_len=params.get('trend_ma_len',50); stop_loss_pct=params.get('stop_loss_pct',0); take_profit_pct=params.get('take_profit_pct',0)
-    ema_fast = df['Close'].ewm(span=fast_ma_len, adjust=False).mean(); ema_slow = df['Close'].ewm(span=slow_ma_len, adjust=False).mean(); df['MACD'] = ema_fast - ema_slow; df['Signal'] = df['MACD'].ewm(span=signal_len, adjust=False).mean(); df['Hist'] = df['MACD'] - df['Signal']
-    df['Hist_Color'] = 'none'; is_rising = df['Hist'] > df['Hist'].shift(1); is_above_zero = df['Hist'] > 0
-    df.loc[(is_above_zero) & (is_rising), 'Hist_Color'] = 'Bright Blue'; df.loc[(is_above_zero) & (~is_rising), 'Hist_Color'] = 'Dark Blue'; df.loc[(~is_above_zero) & (~is_rising), 'Hist_Color'] = 'Bright Magenta'; df.loc[(~is_above_zero) & (is_rising), 'Hist_Color'] = 'Dark Magenta'
-    if use_trend_filter: df['Trend_MA'] = df['Close'].ewm(span=trend_ma_len, adjust=False).mean()
-    df.dropna(inplace=True)
-    if df.empty: return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
-    cash = initial_cash; asset_history = [initial_cash]
-    trades, liquidations, position_status, entry_price, position_margin, stop_loss_price, take_profit_price = 0, 0, 'none', 0, 0, 0, 0
-    for i in range(1, len(df)):
-        current_price = df['Close'].iloc[i]
-        if position_status != 'none':
-            exit_price, pnl, is_liquidated = 0, 0, False
-            if position_status == 'long':
-                liquidation_price = entry_price * (1 - 1/leverage) if leverage > 1 else 0
-                if df['Low'].iloc[i] <= liquidation_price and leverage > 1: exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif stop_loss_pct != 0 and df['Low'].iloc[i] <= stop_loss_price: exit_price = stop_loss_price
-                elif take_profit_pct != 0 and df['High'].iloc[i] >= take_profit_price: exit_price = take_profit_price
-                if exit_price > 0: pnl = _calculate_pnl(entry_price, exit_price, position_margin, leverage, 'long')
-            elif position_status == 'short':
-                liquidation_price = entry_price * (1 + 1/leverage) if leverage > 1 else float('inf')
-                if df['High'].iloc[i] >= liquidation_price and leverage > 1: exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif stop_loss_pct != 0 and df['High'].iloc[i] >= stop_loss_price: exit_price = stop_loss_price
-                elif take_profit_pct != 0 and df['Low'].iloc[i] <= take_profit_price: exit_price = take_profit_price
-                if exit_price > 0: pnl = _calculate_pnl(entry_price, exit_price, position_margin, leverage, 'short')
-            if exit_price > 0:
-                cash = 0 if is_liquidated else (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE); position_status = 'none'
-        long_signal, short_signal = False, False
-        if system_type == 'Normal': long_signal = df['MACD'].iloc[i] > df['Signal'].iloc[i]; short_signal = df['MACD'].iloc[i] < df['Signal'].iloc[i]
-        elif system_type == 'Fast': long_signal = df['Hist_Color'].iloc[i] in ['Bright Blue', 'Dark Magenta']; short_signal = df['Hist_Color'].iloc[i] in ['Dark Blue', 'Bright Magenta']
-        elif system_type == 'Safe': long_signal = df['Hist_Color'].iloc[i] == 'Bright Blue'; short_signal = not long_signal
-        elif system_type == 'Crossover': long_signal = df['MACD'].iloc[i-1] < df['Signal'].iloc[i-1] and df['MACD'].iloc[i] > df['Signal'].iloc[i]; short_signal = df['MACD'].iloc[i-1] > df['Signal'].iloc[i-1] and df['MACD'].iloc[i] < df['Signal'].iloc[i]
-        if use_trend_filter:
-            is_uptrend = current_price > df['Trend_MA'].iloc[i]; is_downtrend = current_price < df['Trend_MA'].iloc[i]
-            long_signal = long_signal and is_uptrend; short_signal = short_signal and is_downtrend
-        if position_status == 'long' and short_signal:
-            pnl = _calculate_pnl(entry_price, current_price, position_margin, leverage, 'long'); cash = (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE); position_status = 'none'; trades += 1
-        elif position_status == 'short' and long_signal:
-            pnl = _calculate_pnl(entry_price, current_price, position_margin, leverage, 'short'); cash = (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE); position_status = 'none'; trades += 1
-        if position_status == 'none' and cash > 0:
-            signal = 'none'
-            if long_signal: signal = 'long'
-            elif short_signal: signal = 'short'
-            if signal != 'none':
-                position_margin, entry_price, position_status, trades = cash, current_price, signal, trades + 1
-                if stop_loss_pct != 0:
-                    if signal == 'long': stop_loss_price = entry_price * (1 + stop_loss_pct / 100); take_profit_price = entry_price * (1 + take_profit_pct / 100)
-                    else: stop_loss_price = entry_price * (1 - stop_loss_pct / 100); take_profit_price = entry_price * (1 - take_profit_pct / 100)
-        current_asset = _calculate_asset(entry_price, current_price, position_margin, leverage, position_status, cash)
-        asset_history.append(current_asset)
-    final_asset = asset_history[-1] if asset_history else initial_cash; total_return = (final_asset / initial_cash - 1) * 100
-    asset_series = pd.Series(asset_history); mdd = (1 - (asset_series / asset_series.cummax())).max() * 100
+    close, low, high = df['Close'].to_numpy(dtype=np.float64), df['Low'].to_numpy(dtype=np.float64), df['High'].to_numpy(dtype=np.float64)
+    macd, macd_signal = _macd(close, fast_ma_len, slow_ma_len, signal_len)
+    trend_ma = _ewm_span(close, trend_ma_len) if use_trend_filter else None
+    # dropna로 데이터프레임을 복사하지 않고 지표가 모두 계산되는 위치부터 잘라서 사용 (입력 데이터프레임에 컬럼도 추가하지 않음)
+    start = _warmup_length(macd, macd_signal, *([trend_ma] if use_trend_filter else []))
+    if start >= len(df): return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
+    # 히스토그램 색은 Fast/Safe 시스템에서만 사용
+    hist_color = _hist_colors(macd - macd_signal)[start:] if system in (SYSTEM_FAST, SYSTEM_SAFE) else None
+    close, macd, macd_signal = close[start:], macd[start:], macd_signal[start:]
+    # 시스템 종류별 롱/숏 신호를 봉마다 계산하지 않고 배열로 한 번에 만듦
+    if system == SYSTEM_NORMAL: long_signal, short_signal = macd > macd_signal, macd < macd_signal
+    # Fast: 롱 색(Bright Blue, Dark Magenta)은 정확히 상승 비트가 켜진 코드이므로 np.isin 대신 비트 하나로 판별
+    elif system == SYSTEM_FAST: long_signal = (hist_color & 1).astype(np.bool_); short_signal = ~long_signal
+    elif system == SYSTEM_SAFE: long_signal = hist_color == HIST_BRIGHT_BLUE; short_signal = ~long_signal
+    elif system == SYSTEM_CROSSOVER: long_signal, short_signal = _crossovers(macd, macd_signal, strict=True)
+    else: long_signal = short_signal = np.zeros(len(close), dtype=np.bool_)
+    if use_trend_filter:
+        trend_ma = trend_ma[start:]
+        long_signal, short_signal = _trend_filter(long_signal, short_signal, close, trend_ma)
+    asset_history, trades, liquidations = _macd_filtered_loop(
+        close, low[start:], high[start:], np.zeros(len(close), dtype=np.bool_), _signal_events(long_signal, short_signal),
+        float(initial_cash), float(fee_rate), float(leverage), float(stop_loss_pct), float(take_profit_pct))
+    final_asset = asset_history[-1] if len(asset_history) else initial_cash; total_return = (final_asset / initial_cash - 1) * 100
+    mdd = _max_drawdown_pct(asset_history)
     return {'total_return_pct': total_return, 'mdd_pct': -mdd, 'total_trades': trades, 'total_liquidations': liquidations, 'asset_history': asset_history}
 
 
@@ -299,80 +937,27 @@ def macd_crossover_with_filter(params, df, initial_cash, fee_rate, leverage):
     leverage = max(1, leverage)
 
     # 2. 지표 계산
-    ema_fast = df['Close'].ewm(span=fast_ma_len, adjust=False).mean()
-    ema_slow = df['Close'].ewm(span=slow_ma_len, adjust=False).mean()
-    df['MACD'] = ema_fast - ema_slow
-    df['Signal'] = df['MACD'].ewm(span=signal_len, adjust=False).mean()
+    # 가격 컬럼은 한 번만 넘파이 배열로 꺼내 지표 계산과 백테스트 루프에 함께 사용
+    close, low, high = df['Close'].to_numpy(dtype=np.float64), df['Low'].to_numpy(dtype=np.float64), df['High'].to_numpy(dtype=np.float64)
+    macd, macd_signal = _macd(close, fast_ma_len, slow_ma_len, signal_len)
     
     # ⭐ 시장 국면 판단을 위한 장기 이동평균선 계산
-    df['MA_regime'] = df['Close'].rolling(window=regime_filter_period).mean()
+    ma_regime = _rolling_mean(close, regime_filter_period)
     
-    df.dropna(inplace=True)
-    if df.empty: return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
-
-    # 3. 백테스팅 변수 초기화
-    cash = initial_cash
-    asset_history = [initial_cash]
-    trades, liquidations, position_status, entry_price, position_margin, stop_loss_price, take_profit_price = 0, 0, 'none', 0, 0, 0, 0
-
-    # 4. 백테스팅 루프
-    for i in range(1, len(df)):
-        current_price = df['Close'].iloc[i]
-        
-        # --- 4-1. 위험 관리 (손절/익절/강제청산) ---
-        if position_status != 'none':
-            exit_price, pnl, is_liquidated = 0, 0, False
-            if position_status == 'long':
-                liquidation_price = entry_price * (1 - 1/leverage) if leverage > 1 else 0
-                if df['Low'].iloc[i] <= liquidation_price and leverage > 1: exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif stop_loss_pct != 0 and df['Low'].iloc[i] <= stop_loss_price: exit_price = stop_loss_price
-                elif take_profit_pct != 0 and df['High'].iloc[i] >= take_profit_price: exit_price = take_profit_price
-                if exit_price > 0: pnl = _calculate_pnl(entry_price, exit_price, position_margin, leverage, 'long')
-            elif position_status == 'short':
-                liquidation_price = entry_price * (1 + 1/leverage) if leverage > 1 else float('inf')
-                if df['High'].iloc[i] >= liquidation_price and leverage > 1: exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif stop_loss_pct != 0 and df['High'].iloc[i] >= stop_loss_price: exit_price = stop_loss_price
-                elif take_profit_pct != 0 and df['Low'].iloc[i] <= take_profit_price: exit_price = take_profit_price
-                if exit_price > 0: pnl = _calculate_pnl(entry_price, exit_price, position_margin, leverage, 'short')
-            if exit_price > 0:
-                cash = 0 if is_liquidated else (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE); position_status = 'none'
-
-        # ⭐ --- 4-2. 시장 국면 필터 적용 ---
-        is_bull_market = current_price > df['MA_regime'].iloc[i]
-
-        # 하락장으로 전환되면, 모든 포지션을 즉시 청산
-        if not is_bull_market and position_status != 'none':
-            pnl = _calculate_pnl(entry_price, current_price, position_margin, leverage, position_status)
-            cash = (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE)
-            position_status = 'none'; trades += 1
-        
-        # 상승장에서만 매매 로직을 실행
-        if is_bull_market:
-            long_signal = df['MACD'].iloc[i-1] < df['Signal'].iloc[i-1] and df['MACD'].iloc[i] > df['Signal'].iloc[i]
-            short_signal = df['MACD'].iloc[i-1] > df['Signal'].iloc[i-1] and df['MACD'].iloc[i] < df['Signal'].iloc[i]
-
-            if position_status == 'long' and short_signal:
-                pnl = _calculate_pnl(entry_price, current_price, position_margin, leverage, 'long'); cash = (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE); position_status = 'none'; trades += 1
-            elif position_status == 'short' and long_signal:
-                pnl = _calculate_pnl(entry_price, current_price, position_margin, leverage, 'short'); cash = (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE); position_status = 'none'; trades += 1
-            
-            if position_status == 'none' and cash > 0:
-                signal = 'none'
-                if long_signal: signal = 'long'
-                elif short_signal: signal = 'short'
-                if signal != 'none':
-                    position_margin, entry_price, position_status, trades = cash, current_price, signal, trades + 1
-                    if stop_loss_pct != 0:
-                        if signal == 'long': stop_loss_price = entry_price * (1 + stop_loss_pct / 100); take_profit_price = entry_price * (1 + take_profit_pct / 100)
-                        else: stop_loss_price = entry_price * (1 - stop_loss_pct / 100); take_profit_price = entry_price * (1 - take_profit_pct / 100)
-        
-        # --- 4-3. 현재 자산 평가 ---
-        current_asset = _calculate_asset(entry_price, current_price, position_margin, leverage, position_status, cash)
-        asset_history.append(current_asset)
-
-    # 5. 최종 결과 계산
-    final_asset = asset_history[-1] if asset_history else initial_cash; total_return = (final_asset / initial_cash - 1) * 100
-    asset_series = pd.Series(asset_history); mdd = (1 - (asset_series / asset_series.cummax())).max() * 100
+    # dropna로 데이터프레임을 복사하지 않고 지표가 모두 계산되는 위치(장기 이동평균 예열 이후)부터 잘라서 사용
+    start = _warmup_length(macd, macd_signal, ma_regime)
+    if start >= len(df): return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
+
+    # 3. 백테스팅 루프 (하락장 봉은 강제 청산, 상승장 봉은 MACD 크로스 신호로 매매)
+    close = close[start:]
+    is_bull_market = close > ma_regime[start:]
+    asset_history, trades, liquidations = _macd_filtered_loop(
+        close, low[start:], high[start:], ~is_bull_market, _signal_events(*_crossovers(macd[start:], macd_signal[start:], strict=True)),
+        float(initial_cash), float(fee_rate), float(leverage), float(stop_loss_pct), float(take_profit_pct))
+
+    # 4. 최종 결과 계산
+    final_asset = asset_history[-1] if len(asset_history) else initial_cash; total_return = (final_asset / initial_cash - 1) * 100
+    mdd = _max_drawdown_pct(asset_history)
     return {'total_return_pct': total_return, 'mdd_pct': -mdd, 'total_trades': trades, 'total_liquidations': liquidations, 'asset_history': asset_history}
 
 
@@ -396,89 +981,27 @@ def macd_crossover_dual_filter(params, df, initial_cash, fee_rate, leverage):
     leverage = max(1, leverage)
 
     # 2. 지표 계산
-    ema_fast = df['Close'].ewm(span=fast_ma_len, adjust=False).mean()
-    ema_slow = df['Close'].ewm(span=slow_ma_len, adjust=False).mean()
-    df['MACD'] = ema_fast - ema_slow
-    df['Signal'] = df['MACD'].ewm(span=signal_len, adjust=False).mean()
-    
-    df['Trend_MA'] = df['Close'].ewm(span=trend_ma_len, adjust=False).mean()
-    df['MA_regime'] = df['Close'].rolling(window=regime_filter_period).mean()
+    # MACD선/신호선/단기 추세선은 종가 한 번 순회로 함께 계산
+    # 가격 컬럼은 한 번만 넘파이 배열로 꺼내 지표 계산과 백테스트 루프에 함께 사용
+    close, low, high = df['Close'].to_numpy(dtype=np.float64), df['Low'].to_numpy(dtype=np.float64), df['High'].to_numpy(dtype=np.float64)
+    macd, macd_signal, trend_ma = _macd_trend(close, fast_ma_len, slow_ma_len, signal_len, trend_ma_len)
+    ma_regime = _rolling_mean(close, regime_filter_period)
     
-    df.dropna(inplace=True)
-    if df.empty: return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
-
-    # 3. 백테스팅 변수 초기화
-    cash = initial_cash
-    asset_history = [initial_cash]
-    trades, liquidations, position_status, entry_price, position_margin, stop_loss_price, take_profit_price = 0, 0, 'none', 0, 0, 0, 0
-
-    # 4. 백테스팅 루프
-    for i in range(1, len(df)):
-        current_price = df['Close'].iloc[i]
-        
-        # --- 4-1. 위험 관리 (손절/익절/강제청산) ---
-        if position_status != 'none':
-            exit_price, pnl, is_liquidated = 0, 0, False
-            if position_status == 'long':
-                liquidation_price = entry_price * (1 - 1/leverage) if leverage > 1 else 0
-                if df['Low'].iloc[i] <= liquidation_price and leverage > 1: exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif stop_loss_pct != 0 and df['Low'].iloc[i] <= stop_loss_price: exit_price = stop_loss_price
-                elif take_profit_pct != 0 and df['High'].iloc[i] >= take_profit_price: exit_price = take_profit_price
-                if exit_price > 0: pnl = _calculate_pnl(entry_price, exit_price, position_margin, leverage, 'long')
-            elif position_status == 'short':
-                liquidation_price = entry_price * (1 + 1/leverage) if leverage > 1 else float('inf')
-                if df['High'].iloc[i] >= liquidation_price and leverage > 1: exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif stop_loss_pct != 0 and df['High'].iloc[i] >= stop_loss_price: exit_price = stop_loss_price
-                elif take_profit_pct != 0 and df['Low'].iloc[i] <= take_profit_price: exit_price = take_profit_price
-                if exit_price > 0: pnl = _calculate_pnl(entry_price, exit_price, position_margin, leverage, 'short')
-            if exit_price > 0:
-                cash = 0 if is_liquidated else (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE); position_status = 'none'
-
-        # ⭐ --- 4-2. 시장 국면 필터 (마스터 스위치) ---
-        is_bull_market = current_price > df['MA_regime'].iloc[i]
-
-        if not is_bull_market:
-            # 하락장이면, 보유 포지션 즉시 청산 후 이번 턴 종료
-            if position_status != 'none':
-                pnl = _calculate_pnl(entry_price, current_price, position_margin, leverage, position_status)
-                cash = (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE)
-                position_status = 'none'; trades += 1
-        else:
-            # ⭐ --- 4-3. 상승장일 때만 매매 로직 실행 ---
-            long_signal = df['MACD'].iloc[i-1] < df['Signal'].iloc[i-1] and df['MACD'].iloc[i] > df['Signal'].iloc[i]
-            short_signal = df['MACD'].iloc[i-1] > df['Signal'].iloc[i-1] and df['MACD'].iloc[i] < df['Signal'].iloc[i]
-            
-            # 단기 추세 필터 적용
-            is_uptrend = current_price > df['Trend_MA'].iloc[i]
-            is_downtrend = current_price < df['Trend_MA'].iloc[i]
-            
-            final_long_signal = long_signal and is_uptrend
-            final_short_signal = short_signal and is_downtrend
-
-            # 포지션 청산 (반대 신호)
-            if position_status == 'long' and final_short_signal:
-                pnl = _calculate_pnl(entry_price, current_price, position_margin, leverage, 'long'); cash = (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE); position_status = 'none'; trades += 1
-            elif position_status == 'short' and final_long_signal:
-                pnl = _calculate_pnl(entry_price, current_price, position_margin, leverage, 'short'); cash = (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE); position_status = 'none'; trades += 1
-            
-            # 신규 포지션 진입
-            if position_status == 'none' and cash > 0:
-                signal = 'none'
-                if final_long_signal: signal = 'long'
-                elif final_short_signal: signal = 'short'
-                if signal != 'none':
-                    position_margin, entry_price, position_status, trades = cash, current_price, signal, trades + 1
-                    if stop_loss_pct != 0:
-                        if signal == 'long': stop_loss_price = entry_price * (1 + stop_loss_pct / 100); take_profit_price = entry_price * (1 + take_profit_pct / 100)
-                        else: stop_loss_price = entry_price * (1 - stop_loss_pct / 100); take_profit_price = entry_price * (1 - take_profit_pct / 100)
-        
-        # --- 4-4. 현재 자산 평가 ---
-        current_asset = _calculate_asset(entry_price, current_price, position_margin, leverage, position_status, cash)
-        asset_history.append(current_asset)
-
-    # 5. 최종 결과 계산
-    final_asset = asset_history[-1] if asset_history else initial_cash; total_return = (final_asset / initial_cash - 1) * 100
-    asset_series = pd.Series(asset_history); mdd = (1 - (asset_series / asset_series.cummax())).max() * 100
+    # dropna로 데이터프레임을 복사하지 않고 지표가 모두 계산되는 위치(장기 이동평균 예열 이후)부터 잘라서 사용
+    start = _warmup_length(macd, macd_signal, trend_ma, ma_regime)
+    if start >= len(df): return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
+
+    # 3. 백테스팅 루프 (하락장 봉은 강제 청산, 상승장 봉은 단기 추세와 같은 방향의 MACD 크로스 신호로 매매)
+    close, trend_ma = close[start:], trend_ma[start:]
+    is_bull_market = close > ma_regime[start:]
+    long_signal, short_signal = _trend_filter(*_crossovers(macd[start:], macd_signal[start:], strict=True), close, trend_ma)
+    asset_history, trades, liquidations = _macd_filtered_loop(
+        close, low[start:], high[start:], ~is_bull_market, _signal_events(long_signal, short_signal),
+        float(initial_cash), float(fee_rate), float(leverage), float(stop_loss_pct), float(take_profit_pct))
+
+    # 4. 최종 결과 계산
+    final_asset = asset_history[-1] if len(asset_history) else initial_cash; total_return = (final_asset / initial_cash - 1) * 100
+    mdd = _max_drawdown_pct(asset_history)
     return {'total_return_pct': total_return, 'mdd_pct': -mdd, 'total_trades': trades, 'total_liquidations': liquidations, 'asset_history': asset_history}
 
 def macd_crossover_advanced_filter(params, df, initial_cash, fee_rate, leverage):
@@ -500,91 +1023,31 @@ def macd_crossover_advanced_filter(params, df, initial_cash, fee_rate, leverage)
     leverage = max(1, leverage)
 
     # 2. 지표 계산
-    ema_fast = df['Close'].ewm(span=fast_ma_len, adjust=False).mean()
-    ema_slow = df['Close'].ewm(span=slow_ma_len, adjust=False).mean()
-    df['MACD'] = ema_fast - ema_slow
-    df['Signal'] = df['MACD'].ewm(span=signal_len, adjust=False).mean()
+    # 가격 컬럼은 한 번만 넘파이 배열로 꺼내 지표 계산과 백테스트 루프에 함께 사용
+    close, low, high = df['Close'].to_numpy(dtype=np.float64), df['Low'].to_numpy(dtype=np.float64), df['High'].to_numpy(dtype=np.float64)
+    macd, macd_signal = _macd(close, fast_ma_len, slow_ma_len, signal_len)
     
-    df = calculate_adx(df, period=adx_period)
-    df['MA_regime'] = df['Close'].rolling(window=regime_filter_period).mean()
+    adx = _cached_indicator(_adx_values, (high, low, close), adx_period)
+    ma_regime = _rolling_mean(close, regime_filter_period)
     
-    df.dropna(inplace=True)
-    if df.empty: return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
-
-    # 3. 백테스팅 변수 초기화
-    cash = initial_cash
-    asset_history = [initial_cash]
-    trades, liquidations, position_status, entry_price, position_margin, stop_loss_price, take_profit_price = 0, 0, 'none', 0, 0, 0, 0
-
-    # 4. 백테스팅 루프
-    for i in range(1, len(df)):
-        current_price = df['Close'].iloc[i]
-        
-        # --- 4-1. 위험 관리 (손절/익절/강제청산) ---
-        if position_status != 'none':
-            exit_price, pnl, is_liquidated = 0, 0, False
-            if position_status == 'long':
-                liquidation_price = entry_price * (1 - 1/leverage) if leverage > 1 else 0
-                if df['Low'].iloc[i] <= liquidation_price and leverage > 1: exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif stop_loss_pct != 0 and df['Low'].iloc[i] <= stop_loss_price: exit_price = stop_loss_price
-                elif take_profit_pct != 0 and df['High'].iloc[i] >= take_profit_price: exit_price = take_profit_price
-                if exit_price > 0: pnl = _calculate_pnl(entry_price, exit_price, position_margin, leverage, 'long')
-            elif position_status == 'short':
-                liquidation_price = entry_price * (1 + 1/leverage) if leverage > 1 else float('inf')
-                if df['High'].iloc[i] >= liquidation_price and leverage > 1: exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif stop_loss_pct != 0 and df['High'].iloc[i] >= stop_loss_price: exit_price = stop_loss_price
-                elif take_profit_pct != 0 and df['Low'].iloc[i] <= take_profit_price: exit_price = take_profit_price
-                if exit_price > 0: pnl = _calculate_pnl(entry_price, exit_price, position_margin, leverage, 'short')
-            if exit_price > 0:
-                cash = 0 if is_liquidated else (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE); position_status = 'none'
-
-        # --- 4-2. 시장 국면 필터 ---
-        is_trending = df['ADX'].iloc[i] > adx_threshold
-        is_bull_market = current_price > df['MA_regime'].iloc[i]
-
-        if not is_trending:
-            if position_status != 'none':
-                pnl = _calculate_pnl(entry_price, current_price, position_margin, leverage, position_status)
-                cash = (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE)
-                position_status = 'none'; trades += 1
-        else: # 추세장일 때만 매매 로직 실행
-            gc = df['MACD'].iloc[i-1] < df['Signal'].iloc[i-1] and df['MACD'].iloc[i] > df['Signal'].iloc[i]
-            dc = df['MACD'].iloc[i-1] > df['Signal'].iloc[i-1] and df['MACD'].iloc[i] < df['Signal'].iloc[i]
-            
-            long_signal, short_signal = False, False
-
-            # ⭐ 로직 수정: 단기 추세 필터 제거하여 신호 발생 가능하게 함
-            if is_bull_market: # 상승장: 순추세 매매
-                long_signal = gc
-                short_signal = dc
-            else: # 하락장: 역추세 매매
-                long_signal = dc
-                short_signal = gc
-
-            # 포지션 청산 (반대 신호)
-            if position_status == 'long' and short_signal:
-                pnl = _calculate_pnl(entry_price, current_price, position_margin, leverage, 'long'); cash = (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE); position_status = 'none'; trades += 1
-            elif position_status == 'short' and long_signal:
-                pnl = _calculate_pnl(entry_price, current_price, position_margin, leverage, 'short'); cash = (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE); position_status = 'none'; trades += 1
-            
-            # 신규 포지션 진입
-            if position_status == 'none' and cash > 0:
-                signal = 'none'
-                if long_signal: signal = 'long'
-                elif short_signal: signal = 'short'
-                if signal != 'none':
-                    position_margin, entry_price, position_status, trades = cash, current_price, signal, trades + 1
-                    if stop_loss_pct != 0:
-                        if signal == 'long': stop_loss_price = entry_price * (1 + stop_loss_pct / 100); take_profit_price = entry_price * (1 + take_profit_pct / 100)
-                        else: stop_loss_price = entry_price * (1 - stop_loss_pct / 100); take_profit_price = entry_price * (1 - take_profit_pct / 100)
-        
-        # --- 4-4. 현재 자산 평가 ---
-        current_asset = _calculate_asset(entry_price, current_price, position_margin, leverage, position_status, cash)
-        asset_history.append(current_asset)
-
-    # 5. 최종 결과 계산
-    final_asset = asset_history[-1] if asset_history else initial_cash; total_return = (final_asset / initial_cash - 1) * 100
-    asset_series = pd.Series(asset_history); mdd = (1 - (asset_series / asset_series.cummax())).max() * 100
+    # dropna로 데이터프레임을 복사하지 않고 지표가 모두 계산되는 위치부터 잘라서 사용
+    start = _warmup_length(macd, macd_signal, adx, ma_regime)
+    if start >= len(df): return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
+
+    # 3. 매매 신호를 배열로 한 번에 계산 (상승장은 순추세, 하락장은 역추세로 크로스 방향을 뒤집음)
+    close = close[start:]
+    is_trending, is_bull_market = adx[start:] > adx_threshold, close > ma_regime[start:]
+    gc, dc = _crossovers(macd[start:], macd_signal[start:], strict=True)
+    long_signal, short_signal = np.where(is_bull_market, gc, dc), np.where(is_bull_market, dc, gc)
+
+    # 4. 백테스팅 루프 (횡보장 봉은 강제 청산)
+    asset_history, trades, liquidations = _macd_filtered_loop(
+        close, low[start:], high[start:], ~is_trending, _signal_events(long_signal, short_signal),
+        float(initial_cash), float(fee_rate), float(leverage), float(stop_loss_pct), float(take_profit_pct))
+
+    # 4. 최종 결과 계산
+    final_asset = asset_history[-1] if len(asset_history) else initial_cash; total_return = (final_asset / initial_cash - 1) * 100
+    mdd = _max_drawdown_pct(asset_history)
     return {'total_return_pct': total_return, 'mdd_pct': -mdd, 'total_trades': trades, 'total_liquidations': liquidations, 'asset_history': asset_history}
 
 
@@ -597,82 +1060,37 @@ def macd_liquidity_tracker_revised_crossover(params, df, initial_cash, fee_rate,
     trend_ma_len=params.get('trend_ma_len',50)
     stop_loss_pct=params.get('stop_loss_pct',0)
     take_profit_pct=params.get('take_profit_pct',0)
-    long_trend_len=params.get('long_trend_len',0)
-    ema_fast = df['Close'].ewm(span=fast_ma_len, adjust=False).mean(); ema_slow = df['Close'].ewm(span=slow_ma_len, adjust=False).mean(); df['MACD'] = ema_fast - ema_slow; df['Signal'] = df['MACD'].ewm(span=signal_len, adjust=False).mean(); df['Hist'] = df['MACD'] - df['Signal']
-    
-    # MACD 관련 지표(MACD선, 신호선, 히스토그램)와 단기 추세 필터용 이동평균선(Trend_MA)를 계산
-    df['Hist_Color'] = 'none'; is_rising = df['Hist'] > df['Hist'].shift(1); is_above_zero = df['Hist'] > 0
-    df.loc[(is_above_zero) & (is_rising), 'Hist_Color'] = 'Bright Blue'; df.loc[(is_above_zero) & (~is_rising), 'Hist_Color'] = 'Dark Blue'; df.loc[(~is_above_zero) & (~is_rising), 'Hist_Color'] = 'Bright Magenta'; df.loc[(~is_above_zero) & (is_rising), 'Hist_Color'] = 'Dark Magenta'
-    if use_trend_filter: df['Trend_MA'] = df['Close'].ewm(span=trend_ma_len, adjust=False).mean()
-    df['long_trend_len'] = df['Close'].ewm(span=long_trend_len, adjust=False).mean()
-    df.dropna(inplace=True)
-
-    # 값이 없는 행 제거, 데이터가 없으면 즉시 함수 종료
-    if df.empty: return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
-
-    # 백테스팅 준비(초기값 초기화)
-    cash = initial_cash; asset_history = [initial_cash]
-    trades, liquidations, position_status, entry_price, position_margin, stop_loss_price, take_profit_price = 0, 0, 'none', 0, 0, 0, 0
+    long_trend_len=params.get('long_trend_len',4800)
+    # MACD 관련 지표(MACD선, 신호선)와 단기 추세 필터용 이동평균선(Trend_MA), 장기 추세선을 계산
+    # 가격 컬럼은 한 번만 넘파이 배열로 꺼내 지표 계산과 백테스트 루프에 함께 사용
+    close, low, high = df['Close'].to_numpy(dtype=np.float64), df['Low'].to_numpy(dtype=np.float64), df['High'].to_numpy(dtype=np.float64)
+    macd, macd_signal = _macd(close, fast_ma_len, slow_ma_len, signal_len)
+    trend_ma = _ewm_span(close, trend_ma_len) if use_trend_filter else None
+    long_trend = _ewm_span(close, long_trend_len)
+
+    # 지표가 모두 계산되는 위치부터 잘라서 사용 (dropna로 데이터프레임을 복사하지 않음), 데이터가 없으면 즉시 함수 종료
+    start = _warmup_length(macd, macd_signal, long_trend, *([trend_ma] if use_trend_filter else []))
+    if start >= len(df): return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
+
+    # 롱/숏 신호를 배열로 한 번에 계산 (종가가 장기 추세선 위에 있는 봉은 신호 없음)
+    close = close[start:]
+    long_signal, short_signal = _crossovers(macd[start:], macd_signal[start:], strict=True)
+    # 단기 추세선을 사용하여 롱/숏 신호를 한 번 거름.
+    if use_trend_filter:
+        trend_ma = trend_ma[start:]
+        long_signal, short_signal = _trend_filter(long_signal, short_signal, close, trend_ma)
+    below_long_trend = close <= long_trend[start:]
+    long_signal &= below_long_trend; short_signal &= below_long_trend
+    events = _signal_events(long_signal, short_signal)
 
     # 핵심 거래 로직
-    for i in range(1, len(df)):
-        current_price = df['Close'].iloc[i]
-
-        # 현재 포지션에 진입해 있을 경우
-        if position_status != 'none':
-            exit_price, pnl, is_liquidated = 0, 0, False
-            # 롱일 경우 -> 청산/손절/익절 여부 판단
-            if position_status == 'long':
-                liquidation_price = entry_price * (1 - 1/leverage) if leverage > 1 else 0
-                if df['Low'].iloc[i] <= liquidation_price and leverage > 1: exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif stop_loss_pct != 0 and df['Low'].iloc[i] <= stop_loss_price: exit_price = stop_loss_price
-                elif take_profit_pct != 0 and df['High'].iloc[i] >= take_profit_price: exit_price = take_profit_price
-                if exit_price > 0: pnl = _calculate_pnl(entry_price, exit_price, position_margin, leverage, 'long')
-            # 숏일 경우 -> 청산/손절/익절 여부 판단
-            elif position_status == 'short':
-                liquidation_price = entry_price * (1 + 1/leverage) if leverage > 1 else float('inf')
-                if df['High'].iloc[i] >= liquidation_price and leverage > 1: exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif stop_loss_pct != 0 and df['High'].iloc[i] >= stop_loss_price: exit_price = stop_loss_price
-                elif take_profit_pct != 0 and df['Low'].iloc[i] <= take_profit_price: exit_price = take_profit_price
-                if exit_price > 0: pnl = _calculate_pnl(entry_price, exit_price, position_margin, leverage, 'short')
-            # 조건에 해당할 경우 포지션 청산
-            if exit_price > 0:
-                cash = 0 if is_liquidated else (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE); position_status = 'none'
-        
-        # 롱인지 숏인지 판단
-        long_signal, short_signal = False, False
-
-        # 상승장인 경우
-        if current_price <= df['long_trend_len'].iloc[i]:
-            # 골든크로스(롱) vs 데드크로스(숏)
-            long_signal = df['MACD'].iloc[i-1] < df['Signal'].iloc[i-1] and df['MACD'].iloc[i] > df['Signal'].iloc[i]; short_signal = df['MACD'].iloc[i-1] > df['Signal'].iloc[i-1] and df['MACD'].iloc[i] < df['Signal'].iloc[i]
-            # 단기 추세선을 사용하여 롱/숏 신호를 한 번 거름.
-            if use_trend_filter:
-                is_uptrend = current_price > df['Trend_MA'].iloc[i]; is_downtrend = current_price < df['Trend_MA'].iloc[i]
-                long_signal = long_signal and is_uptrend; short_signal = short_signal and is_downtrend
-            if position_status == 'long' and short_signal:
-                pnl = _calculate_pnl(entry_price, current_price, position_margin, leverage, 'long'); cash = (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE); position_status = 'none'; trades += 1
-            elif position_status == 'short' and long_signal:
-                pnl = _calculate_pnl(entry_price, current_price, position_margin, leverage, 'short'); cash = (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE); position_status = 'none'; trades += 1
-
-        # 포지션 진입
-        if position_status == 'none' and cash > 0:
-            signal = 'none'
-            if long_signal: signal = 'long'
-            elif short_signal: signal = 'short'
-            if signal != 'none':
-                position_margin, entry_price, position_status, trades = cash, current_price, signal, trades + 1
-                if stop_loss_pct != 0:
-                    if signal == 'long': stop_loss_price = entry_price * (1 + stop_loss_pct / 100); take_profit_price = entry_price * (1 + take_profit_pct / 100)
-                    else: stop_loss_price = entry_price * (1 - stop_loss_pct / 100); take_profit_price = entry_price * (1 - take_profit_pct / 100)
-        
-        # 자산 기록
-        current_asset = _calculate_asset(entry_price, current_price, position_margin, leverage, position_status, cash)
-        asset_history.append(current_asset)
+    asset_history, trades, liquidations = _macd_filtered_loop(
+        close, low[start:], high[start:], np.zeros(len(close), dtype=np.bool_), events,
+        float(initial_cash), float(fee_rate), float(leverage), float(stop_loss_pct), float(take_profit_pct))
     
     # 최종 결과 반환
-    final_asset = asset_history[-1] if asset_history else initial_cash; total_return = (final_asset / initial_cash - 1) * 100
-    asset_series = pd.Series(asset_history); mdd = (1 - (asset_series / asset_series.cummax())).max() * 100
+    final_asset = asset_history[-1] if len(asset_history) else initial_cash; total_return = (final_asset / initial_cash - 1) * 100
+    mdd = _max_drawdown_pct(asset_history)
     return {'total_return_pct': total_return, 'mdd_pct': -mdd, 'total_trades': trades, 'total_liquidations': liquidations, 'asset_history': asset_history}
 
 def simple_ma_strategy(params, df, initial_cash, fee_rate, leverage=1):
@@ -684,49 +1102,28 @@ def simple_ma_strategy(params, df, initial_cash, fee_rate, leverage=1):
     # 1. 파라미터 설정
     ma_period = params.get('ma_period', 50)
 
-    # 2. 지표 계산
-    df['MA'] = df['Close'].rolling(window=ma_period).mean()
-    df.dropna(inplace=True)
+    # 2. 지표 계산 (dropna 대신 이동평균 예열이 끝나는 위치부터 잘라서 사용)
+    # 가격 컬럼은 한 번만 넘파이 배열로 꺼내 지표 계산과 백테스트 루프에 함께 사용
+    close = df['Close'].to_numpy(dtype=np.float64)
+    ma = _rolling_mean(close, ma_period)
+    start = _warmup_length(ma)
 
-    if df.empty:
+    if start >= len(df):
         return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'asset_history': []}
 
-    # 3. 백테스팅 준비
-    cash = initial_cash
-    coins = 0
-    trades = 0
-    asset_history = [initial_cash]
-
-    # 4. 핵심 거래 로직
-    for i in range(1, len(df)):
-        current_price = df['Close'].iloc[i]
-        
-        # 매수 신호: 가격이 이동평균선을 상향 돌파 (골든 크로스)
-        is_buy_signal = df['Close'].iloc[i-1] <= df['MA'].iloc[i-1] and df['Close'].iloc[i] > df['MA'].iloc[i]
-        
-        # 매도 신호: 가격이 이동평균선을 하향 돌파 (데드 크로스)
-        is_sell_signal = df['Close'].iloc[i-1] >= df['MA'].iloc[i-1] and df['Close'].iloc[i] < df['MA'].iloc[i]
-
-        if is_buy_signal and cash > 0:
-            # 보유 현금으로 모두 매수
-            coins = (cash / current_price) * (1 - fee_rate)
-            cash = 0
-            trades += 1
-        elif is_sell_signal and coins > 0:
-            # 보유 코인을 모두 매도
-            cash = (coins * current_price) * (1 - fee_rate)
-            coins = 0
-            trades += 1
-        
-        # 현재 자산 기록
-        current_asset = cash + coins * current_price
-        asset_history.append(current_asset)
+    # 3. 돌파 신호를 배열로 한 번에 계산
+    # 매수: 가격이 이동평균선을 상향 돌파 (골든 크로스), 매도: 가격이 이동평균선을 하향 돌파 (데드 크로스)
+    close = close[start:]
+    is_buy_signal, is_sell_signal = _crossovers(close, ma[start:])
+
+    # 4. 핵심 거래 로직 (보유 현금으로 모두 매수 / 보유 코인을 모두 매도)
+    # 자산 기록은 초기 자본을 맨 앞에 둔 배열 하나로 커널에서 바로 채움 (결과를 다시 이어 붙이며 복사하지 않음)
+    asset_history, trades = _ma_crossover_loop(close, is_buy_signal, is_sell_signal, float(initial_cash), float(fee_rate), True)
 
     # 5. 최종 결과 계산 및 반환
     final_asset = asset_history[-1]
     total_return = (final_asset / initial_cash - 1) * 100
-    asset_series = pd.Series(asset_history)
-    mdd = (1 - (asset_series / asset_series.cummax())).max() * 100
+    mdd = _max_drawdown_pct(asset_history)
     
     return {
         'total_return_pct': total_return,
@@ -753,78 +1150,30 @@ def macd_final_strategy(params, df, initial_cash, fee_rate, leverage):
     leverage = max(1, leverage)
 
     # 2. 지표 계산
-    ema_fast = df['Close'].ewm(span=fast_ma_len, adjust=False).mean()
-    ema_slow = df['Close'].ewm(span=slow_ma_len, adjust=False).mean()
-    df['MACD'] = ema_fast - ema_slow
-    df['Signal'] = df['MACD'].ewm(span=signal_len, adjust=False).mean()
-    
-    df['Trend_MA'] = df['Close'].ewm(span=trend_ma_len, adjust=False).mean()
-    df['MA_regime'] = df['Close'].rolling(window=regime_filter_period).mean()
+    # MACD선/신호선/단기 추세선은 종가 한 번 순회로 함께 계산
+    # 가격 컬럼은 한 번만 넘파이 배열로 꺼내 지표 계산과 백테스트 루프에 함께 사용
+    close, low, high = df['Close'].to_numpy(dtype=np.float64), df['Low'].to_numpy(dtype=np.float64), df['High'].to_numpy(dtype=np.float64)
+    macd, macd_signal, trend_ma = _macd_trend(close, fast_ma_len, slow_ma_len, signal_len, trend_ma_len)
+    ma_regime = _rolling_mean(close, regime_filter_period)
     
-    df.dropna(inplace=True)
-    if df.empty: return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
-
-    # 3. 백테스팅 변수 초기화
-    cash = initial_cash
-    asset_history = [initial_cash]
-    trades, liquidations, position_status, entry_price, position_margin, stop_loss_price, take_profit_price = 0, 0, 'none', 0, 0, 0, 0
-
-    # 4. 백테스팅 루프
-    for i in range(1, len(df)):
-        current_price = df['Close'].iloc[i]
-        
-        # --- 4-1. 위험 관리 (손절/익절/강제청산) ---
-        if position_status != 'none':
-            exit_price, pnl, is_liquidated = 0, 0, False
-            if position_status == 'long':
-                liquidation_price = entry_price * (1 - 1/leverage) if leverage > 1 else 0
-                if leverage > 1 and df['Low'].iloc[i] <= liquidation_price: exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif stop_loss_pct != 0 and df['Low'].iloc[i] <= stop_loss_price: exit_price = stop_loss_price
-                elif take_profit_pct != 0 and df['High'].iloc[i] >= take_profit_price: exit_price = take_profit_price
-                if exit_price > 0: pnl = _calculate_pnl(entry_price, exit_price, position_margin, leverage, 'long')
-            elif position_status == 'short':
-                liquidation_price = entry_price * (1 + 1/leverage) if leverage > 1 else float('inf')
-                if leverage > 1 and df['High'].iloc[i] >= liquidation_price: exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif stop_loss_pct != 0 and df['High'].iloc[i] >= stop_loss_price: exit_price = stop_loss_price
-                elif take_profit_pct != 0 and df['Low'].iloc[i] <= take_profit_price: exit_price = take_profit_price
-                if exit_price > 0: pnl = _calculate_pnl(entry_price, exit_price, position_margin, leverage, 'short')
-            if exit_price > 0:
-                cash = 0 if is_liquidated else (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE); position_status = 'none'
-
-        # --- 4-2. 시장 국면 필터 (마스터 스위치) ---
-        is_bull_market = current_price > df['MA_regime'].iloc[i]
-
-        # --- 4-3. 상승장일 때만 매매 로직 실행 ---
-        long_signal = df['MACD'].iloc[i-1] < df['Signal'].iloc[i-1] and df['MACD'].iloc[i] > df['Signal'].iloc[i]
-        short_signal = df['MACD'].iloc[i-1] > df['Signal'].iloc[i-1] and df['MACD'].iloc[i] < df['Signal'].iloc[i]
-
-        if not is_bull_market:
-            temp = long_signal
-            long_signal = short_signal
-            short_signal = temp
-        
-        is_uptrend = current_price > df['Trend_MA'].iloc[i]
-        long_signal = long_signal and is_uptrend
-        # 숏 포지션은 진입하지 않으므로 short_signal은 청산 용도로만 사용
-        
-        if position_status == 'long' and short_signal:
-            pnl = _calculate_pnl(entry_price, current_price, position_margin, leverage, 'long'); cash = (position_margin + pnl) * (1 - fee_rate); cash = min(cash, MAX_ASSET_VALUE); position_status = 'none'; trades += 1
-        
-        if position_status == 'none' and cash > 0 and long_signal:
-            signal = 'long'
-            position_margin, entry_price, position_status, trades = cash, current_price, signal, trades + 1
-            if stop_loss_pct != 0:
-                stop_loss_price = entry_price * (1 + stop_loss_pct / 100)
-                take_profit_price = entry_price * (1 + take_profit_pct / 100)
-
-        
-        # --- 4-4. 현재 자산 평가 ---
-        current_asset = _calculate_asset(entry_price, current_price, position_margin, leverage, position_status, cash)
-        asset_history.append(current_asset)
-
-    # 5. 최종 결과 계산
-    final_asset = asset_history[-1] if asset_history else initial_cash; total_return = (final_asset / initial_cash - 1) * 100
-    asset_series = pd.Series(asset_history); mdd = (1 - (asset_series / asset_series.cummax())).max() * 100
+    # dropna로 데이터프레임을 복사하지 않고 지표가 모두 계산되는 위치(장기 이동평균 예열 이후)부터 잘라서 사용
+    start = _warmup_length(macd, macd_signal, trend_ma, ma_regime)
+    if start >= len(df): return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
+
+    # 3. 백테스팅 루프 (공용 MACD 커널 사용, 롱 전용이므로 숏 신호는 롱 청산에만 사용)
+    close = close[start:]
+    golden_cross, dead_cross = _crossovers(macd[start:], macd_signal[start:], strict=True)
+    # 하락장에서는 크로스 신호를 반대로 해석
+    is_bull_market = close > ma_regime[start:]
+    long_signal = np.where(is_bull_market, golden_cross, dead_cross) & (close > trend_ma[start:])
+    short_signal = np.where(is_bull_market, dead_cross, golden_cross)
+    asset_history, trades, liquidations = _macd_filtered_loop(
+        close, low[start:], high[start:], np.zeros(len(close), dtype=np.bool_), _signal_events(long_signal, short_signal),
+        float(initial_cash), float(fee_rate), float(leverage), float(stop_loss_pct), float(take_profit_pct), False)
+
+    # 4. 최종 결과 계산
+    final_asset = asset_history[-1] if len(asset_history) else initial_cash; total_return = (final_asset / initial_cash - 1) * 100
+    mdd = _max_drawdown_pct(asset_history)
     return {'total_return_pct': total_return, 'mdd_pct': -mdd, 'total_trades': trades, 'total_liquidations': liquidations, 'asset_history': asset_history}
 
 def momentum_spike_scalping_long_short(params, df, initial_cash, fee_rate, leverage):
@@ -845,87 +1194,23 @@ def momentum_spike_scalping_long_short(params, df, initial_cash, fee_rate, lever
     # 숏 진입을 위한 하락률 기준
     fall_pct = -spike_pct
 
-    # 2. 지표 계산
-    df['pct_change'] = (df['Close'] / df['Open'] - 1) * 100
-    df.dropna(inplace=True)
+    # 2. 지표 계산 (캔들 상승률은 아래에서 넘파이 배열로 계산, 입력 데이터에 NaN이 없으므로 dropna로 데이터프레임을 복사하지 않음)
 
     if df.empty:
         return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
 
-    # 3. 백테스팅 준비
-    cash = initial_cash
-    asset_history = [initial_cash]
-    trades, liquidations, position_status, entry_price, position_margin = 0, 0, 'none', 0, 0
-    stop_loss_price, take_profit_price, liquidation_price = 0, 0, 0
-
-    # 4. 핵심 거래 로직
-    for i in range(1, len(df)):
-        current_price = df['Close'].iloc[i]
-
-        # 4-1. 포지션이 있을 경우: 위험 관리
-        if position_status != 'none':
-            exit_price, is_liquidated = 0, False
-            
-            # 롱 포지션 청산 조건
-            if position_status == 'long':
-                if leverage > 1 and df['Low'].iloc[i] <= liquidation_price:
-                    exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif df['Low'].iloc[i] <= stop_loss_price:
-                    exit_price = stop_loss_price
-                elif df['High'].iloc[i] >= take_profit_price:
-                    exit_price = take_profit_price
-            
-            # 숏 포지션 청산 조건
-            elif position_status == 'short':
-                if leverage > 1 and df['High'].iloc[i] >= liquidation_price:
-                    exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif df['High'].iloc[i] >= stop_loss_price: # 숏 포지션의 손절은 가격 상승
-                    exit_price = stop_loss_price
-                elif df['Low'].iloc[i] <= take_profit_price: # 숏 포지션의 익절은 가격 하락
-                    exit_price = take_profit_price
+    # 3. 백테스팅 루프 (njit 커널 사용, 전체 자본을 증거금으로 사용)
+    # 봉마다 .iloc로 조회하지 않도록 필요한 컬럼을 float64 넘파이 배열로 한 번만 꺼냄 (커널이 입력 dtype마다 다시 컴파일되지 않도록)
+    close, high, low, open_prices = (df[col].to_numpy(dtype=np.float64) for col in ('Close', 'High', 'Low', 'Open'))
+    # 직전 캔들의 상승률로 봉마다 급등/급락 여부를 루프 전에 배열로 한 번에 계산 (급등이면 롱, 급락이면 숏)
+    asset_history, trades, liquidations, max_drawdown = _momentum_spike_loop(
+        open_prices, close, low, high, _spike_events_nb(open_prices, close, spike_pct, fall_pct),
+        float(initial_cash), float(fee_rate), float(leverage), stop_loss_pct, take_profit_pct, 1.0, 0.0, False)
 
-            if exit_price > 0:
-                pnl = _calculate_pnl(entry_price, exit_price, position_margin, leverage, position_status)
-                cash = 0 if is_liquidated else (position_margin + pnl) * (1 - fee_rate)
-                cash = min(cash, MAX_ASSET_VALUE)
-                position_status = 'none'
-                trades += 1
-
-        # 4-2. 포지션이 없을 경우: 진입 신호 확인
-        if position_status == 'none' and cash > 0:
-            signal = 'none'
-            # 롱 진입 신호 확인
-            if df['pct_change'].iloc[i-1] >= spike_pct:
-                signal = 'long'
-            # 숏 진입 신호 확인
-            elif df['pct_change'].iloc[i-1] <= fall_pct:
-                signal = 'short'
-
-            if signal != 'none':
-                entry_price = df['Open'].iloc[i]
-                position_margin = cash
-                position_status = signal
-                trades += 1
-                
-                if signal == 'long':
-                    take_profit_price = entry_price * (1 + take_profit_pct / 100)
-                    stop_loss_price = entry_price * (1 + stop_loss_pct / 100)
-                    if leverage > 1: liquidation_price = entry_price * (1 - 1/leverage)
-                
-                elif signal == 'short':
-                    take_profit_price = entry_price * (1 - take_profit_pct / 100) # 숏 익절
-                    stop_loss_price = entry_price * (1 - stop_loss_pct / 100) # 숏 손절
-                    if leverage > 1: liquidation_price = entry_price * (1 + 1/leverage)
-        
-        # 4-3. 현재 자산 평가 및 기록
-        current_asset = _calculate_asset(entry_price, current_price, position_margin, leverage, position_status, cash)
-        asset_history.append(current_asset)
-
-    # 5. 최종 결과 계산 및 반환
-    final_asset = asset_history[-1] if asset_history else initial_cash
+    # 4. 최종 결과 계산 및 반환
+    final_asset = asset_history[-1] if len(asset_history) else initial_cash
     total_return = (final_asset / initial_cash - 1) * 100
-    asset_series = pd.Series(asset_history)
-    mdd = (1 - (asset_series / asset_series.cummax())).max() * 100 if not asset_series.empty else 0
+    mdd = max_drawdown * 100
     
     return {
         'total_return_pct': total_return,
@@ -955,87 +1240,23 @@ def momentum_spike_scalping_long_short_inverse(params, df, initial_cash, fee_rat
     # 숏 진입을 위한 하락률 기준
     fall_pct = -spike_pct
 
-    # 2. 지표 계산
-    df['pct_change'] = (df['Close'] / df['Open'] - 1) * 100
-    df.dropna(inplace=True)
+    # 2. 지표 계산 (캔들 상승률은 아래에서 넘파이 배열로 계산, 입력 데이터에 NaN이 없으므로 dropna로 데이터프레임을 복사하지 않음)
 
     if df.empty:
         return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
 
-    # 3. 백테스팅 준비
-    cash = initial_cash
-    asset_history = [initial_cash]
-    trades, liquidations, position_status, entry_price, position_margin = 0, 0, 'none', 0, 0
-    stop_loss_price, take_profit_price, liquidation_price = 0, 0, 0
-
-    # 4. 핵심 거래 로직
-    for i in range(1, len(df)):
-        current_price = df['Close'].iloc[i]
-
-        # 4-1. 포지션이 있을 경우: 위험 관리
-        if position_status != 'none':
-            exit_price, is_liquidated = 0, False
-            
-            # 롱 포지션 청산 조건
-            if position_status == 'long':
-                if leverage > 1 and df['Low'].iloc[i] <= liquidation_price:
-                    exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif df['Low'].iloc[i] <= stop_loss_price:
-                    exit_price = stop_loss_price
-                elif df['High'].iloc[i] >= take_profit_price:
-                    exit_price = take_profit_price
-            
-            # 숏 포지션 청산 조건
-            elif position_status == 'short':
-                if leverage > 1 and df['High'].iloc[i] >= liquidation_price:
-                    exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif df['High'].iloc[i] >= stop_loss_price: # 숏 포지션의 손절은 가격 상승
-                    exit_price = stop_loss_price
-                elif df['Low'].iloc[i] <= take_profit_price: # 숏 포지션의 익절은 가격 하락
-                    exit_price = take_profit_price
-
-            if exit_price > 0:
-                pnl = _calculate_pnl(entry_price, exit_price, position_margin, leverage, position_status)
-                cash = 0 if is_liquidated else (position_margin + pnl) * (1 - fee_rate)
-                cash = min(cash, MAX_ASSET_VALUE)
-                position_status = 'none'
-                trades += 1
-
-        # 4-2. 포지션이 없을 경우: 진입 신호 확인
-        if position_status == 'none' and cash > 0:
-            signal = 'none'
-            # 롱 진입 신호 확인
-            if df['pct_change'].iloc[i-1] >= spike_pct:
-                signal = 'short'
-            # 숏 진입 신호 확인
-            elif df['pct_change'].iloc[i-1] <= fall_pct:
-                signal = 'long'
-
-            if signal != 'none':
-                entry_price = df['Open'].iloc[i]
-                position_margin = cash
-                position_status = signal
-                trades += 1
-                
-                if signal == 'long':
-                    take_profit_price = entry_price * (1 + take_profit_pct / 100)
-                    stop_loss_price = entry_price * (1 + stop_loss_pct / 100)
-                    if leverage > 1: liquidation_price = entry_price * (1 - 1/leverage)
-                
-                elif signal == 'short':
-                    take_profit_price = entry_price * (1 - take_profit_pct / 100) # 숏 익절
-                    stop_loss_price = entry_price * (1 - stop_loss_pct / 100) # 숏 손절
-                    if leverage > 1: liquidation_price = entry_price * (1 + 1/leverage)
-        
-        # 4-3. 현재 자산 평가 및 기록
-        current_asset = _calculate_asset(entry_price, current_price, position_margin, leverage, position_status, cash)
-        asset_history.append(current_asset)
+    # 3. 백테스팅 루프 (njit 커널 사용, 전체 자본을 증거금으로 사용)
+    # 봉마다 .iloc로 조회하지 않도록 필요한 컬럼을 float64 넘파이 배열로 한 번만 꺼냄 (커널이 입력 dtype마다 다시 컴파일되지 않도록)
+    close, high, low, open_prices = (df[col].to_numpy(dtype=np.float64) for col in ('Close', 'High', 'Low', 'Open'))
+    # 직전 캔들의 상승률로 봉마다 급등/급락 여부를 루프 전에 배열로 한 번에 계산 (급등이면 숏, 급락이면 롱: 신호 코드의 부호만 뒤집음)
+    asset_history, trades, liquidations, max_drawdown = _momentum_spike_loop(
+        open_prices, close, low, high, -_spike_events_nb(open_prices, close, spike_pct, fall_pct),
+        float(initial_cash), float(fee_rate), float(leverage), stop_loss_pct, take_profit_pct, 1.0, 0.0, False)
 
-    # 5. 최종 결과 계산 및 반환
-    final_asset = asset_history[-1] if asset_history else initial_cash
+    # 4. 최종 결과 계산 및 반환
+    final_asset = asset_history[-1] if len(asset_history) else initial_cash
     total_return = (final_asset / initial_cash - 1) * 100
-    asset_series = pd.Series(asset_history)
-    mdd = (1 - (asset_series / asset_series.cummax())).max() * 100 if not asset_series.empty else 0
+    mdd = max_drawdown * 100
     
     return {
         'total_return_pct': total_return,
@@ -1058,78 +1279,21 @@ def momentum_spike_scalping_long_short_half_capital(params, df, initial_cash, fe
         spike_pct, take_profit_pct, stop_loss_pct = 3.0, 1.0, -1.0
     fall_pct = -spike_pct
 
-    # 2. 지표 계산
-    df['pct_change'] = (df['Close'] / df['Open'] - 1) * 100
-    df.dropna(inplace=True)
+    # 2. 지표 계산 (캔들 상승률은 아래에서 넘파이 배열로 계산, 입력 데이터에 NaN이 없으므로 dropna로 데이터프레임을 복사하지 않음)
     if df.empty: return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
 
-    # 3. 백테스팅 준비
-    cash = initial_cash
-    asset_history = [initial_cash]
-    trades, liquidations, position_status, entry_price, position_margin = 0, 0, 'none', 0, 0
-    stop_loss_price, take_profit_price, liquidation_price = 0, 0, 0
-
-    # 4. 핵심 거래 로직
-    for i in range(1, len(df)):
-        current_price = df['Close'].iloc[i]
-
-        # --- 4-1. 포지션이 있을 경우: 위험 관리 ---
-        if position_status != 'none':
-            exit_price, is_liquidated = 0, False
-            if position_status == 'long':
-                if leverage > 1 and df['Low'].iloc[i] <= liquidation_price: exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif df['Low'].iloc[i] <= stop_loss_price: exit_price = stop_loss_price
-                elif df['High'].iloc[i] >= take_profit_price: exit_price = take_profit_price
-            elif position_status == 'short':
-                if leverage > 1 and df['High'].iloc[i] >= liquidation_price: exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif df['High'].iloc[i] >= stop_loss_price: exit_price = stop_loss_price
-                elif df['Low'].iloc[i] <= take_profit_price: exit_price = take_profit_price
-
-            if exit_price > 0:
-                pnl = _calculate_pnl(entry_price, exit_price, position_margin, leverage, position_status)
-                # ⭐ 포지션 종료 시, 남겨둔 현금(cash)에 포지션 결과(position_margin + pnl)를 더함
-                # 청산 시에는 position_margin이 0이 되므로 남은 현금만 갖게 됨
-                if not is_liquidated:
-                    cash += (position_margin + pnl) * (1 - fee_rate)
-                
-                cash = min(cash, MAX_ASSET_VALUE)
-                position_status, position_margin, trades = 'none', 0, trades + 1
-
-        # --- 4-2. 포지션이 없을 경우: 진입 신호 확인 ---
-        if position_status == 'none' and cash > 0:
-            signal = 'none'
-            if df['pct_change'].iloc[i-1] >= spike_pct: signal = 'long'
-            elif df['pct_change'].iloc[i-1] <= fall_pct: signal = 'short'
-
-            if signal != 'none':
-                # ⭐ 진입 시, 현재 현금(cash)의 50%만 포지션 증거금(position_margin)으로 사용
-                position_margin = cash * 0.5
-                cash -= position_margin # 남은 50%는 현금으로 보유
-                
-                entry_price, position_status, trades = df['Open'].iloc[i], signal, trades + 1
-                
-                if signal == 'long':
-                    take_profit_price = entry_price * (1 + take_profit_pct / 100)
-                    stop_loss_price = entry_price * (1 + stop_loss_pct / 100)
-                    if leverage > 1: liquidation_price = entry_price * (1 - 1/leverage)
-                elif signal == 'short':
-                    take_profit_price = entry_price * (1 - take_profit_pct / 100)
-                    stop_loss_price = entry_price * (1 - stop_loss_pct / 100)
-                    if leverage > 1: liquidation_price = entry_price * (1 + 1/leverage)
-        
-        # --- 4-3. 현재 자산 평가 및 기록 ---
-        current_asset = cash
-        if position_status != 'none':
-            # ⭐ 현재 자산 = 보유 현금 + (포지션의 현재 가치)
-            current_asset += _calculate_asset(entry_price, current_price, position_margin, leverage, position_status, 0)
-        
-        asset_history.append(current_asset)
+    # 3. 백테스팅 루프 (njit 커널 사용, 진입 시 현금의 50%만 증거금으로 사용하고 나머지는 현금으로 보유)
+    # 봉마다 .iloc로 조회하지 않도록 필요한 컬럼을 float64 넘파이 배열로 한 번만 꺼냄 (커널이 입력 dtype마다 다시 컴파일되지 않도록)
+    close, high, low, open_prices = (df[col].to_numpy(dtype=np.float64) for col in ('Close', 'High', 'Low', 'Open'))
+    # 직전 캔들의 상승률로 봉마다 급등/급락 여부를 루프 전에 배열로 한 번에 계산 (급등이면 롱, 급락이면 숏)
+    asset_history, trades, liquidations, max_drawdown = _momentum_spike_loop(
+        open_prices, close, low, high, _spike_events_nb(open_prices, close, spike_pct, fall_pct),
+        float(initial_cash), float(fee_rate), float(leverage), stop_loss_pct, take_profit_pct, 0.5, -np.inf, False)
 
-    # 5. 최종 결과 계산 및 반환
-    final_asset = asset_history[-1] if asset_history else initial_cash
+    # 4. 최종 결과 계산 및 반환
+    final_asset = asset_history[-1] if len(asset_history) else initial_cash
     total_return = (final_asset / initial_cash - 1) * 100
-    asset_series = pd.Series(asset_history)
-    mdd = (1 - (asset_series / asset_series.cummax())).max() * 100 if not asset_series.empty else 0
+    mdd = max_drawdown * 100
     
     return {
         'total_return_pct': total_return,
@@ -1154,82 +1318,40 @@ def momentum_spike_scalping_long_short_realistic(params, df, initial_cash, fee_r
         min_order_size_btc = 0.001
     fall_pct = -spike_pct
 
-    # 2. 지표 계산
-    df['pct_change'] = (df['Close'] / df['Open'] - 1) * 100
-    df.dropna(inplace=True)
+    # 2. 지표 계산 (캔들 상승률은 아래에서 넘파이 배열로 계산, 입력 데이터에 NaN이 없으므로 dropna로 데이터프레임을 복사하지 않음)
     if df.empty: return {'total_return_pct': 0, 'mdd_pct': 0, 'total_trades': 0, 'total_liquidations': 0, 'asset_history': []}
 
-    # 3. 백테스팅 준비
-    cash = initial_cash
-    asset_history = [initial_cash]
-    trades, liquidations, position_status, entry_price, position_margin = 0, 0, 'none', 0, 0
-    stop_loss_price, take_profit_price, liquidation_price = 0, 0, 0
-
-    # 4. 핵심 거래 로직
-    for i in range(1, len(df)):
-        current_price = df['Close'].iloc[i]
-
-        # --- 4-1. 위험 관리 (포지션 종료) ---
-        if position_status != 'none':
-            exit_price, is_liquidated = 0, False
-            if position_status == 'long':
-                if leverage > 1 and df['Low'].iloc[i] <= liquidation_price: exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif df['Low'].iloc[i] <= stop_loss_price: exit_price = stop_loss_price
-                elif df['High'].iloc[i] >= take_profit_price: exit_price = take_profit_price
-            elif position_status == 'short':
-                if leverage > 1 and df['High'].iloc[i] >= liquidation_price: exit_price, liquidations, is_liquidated = liquidation_price, liquidations + 1, True
-                elif df['High'].iloc[i] >= stop_loss_price: exit_price = stop_loss_price
-                elif df['Low'].iloc[i] <= take_profit_price: exit_price = take_profit_price
-            
-            if exit_price > 0:
-                pnl = _calculate_pnl(entry_price, exit_price, position_margin, leverage, position_status)
-                
-                # ⭐ --- 현실적인 레버리지 수수료 계산 로직 ---
-                position_size = position_margin * leverage
-                # 진입과 청산, 두 번의 거래에 대한 수수료를 한 번에 계산
-                fee = position_size * fee_rate * 2 
+    # 3. 백테스팅 루프 (njit 커널 사용, 50% 자본 + 최소 주문량 확인 + 포지션 규모 기준 수수료)
+    # 봉마다 .iloc로 조회하지 않도록 필요한 컬럼을 float64 넘파이 배열로 한 번만 꺼냄 (커널이 입력 dtype마다 다시 컴파일되지 않도록)
+    close, high, low, open_prices = (df[col].to_numpy(dtype=np.float64) for col in ('Close', 'High', 'Low', 'Open'))
+    # 직전 캔들의 상승률로 봉마다 급등/급락 여부를 루프 전에 배열로 한 번에 계산 (급등이면 롱, 급락이면 숏)
+    asset_history, trades, liquidations, max_drawdown = _momentum_spike_loop(
+        open_prices, close, low, high, _spike_events_nb(open_prices, close, spike_pct, fall_pct),
+        float(initial_cash), float(fee_rate), float(leverage), stop_loss_pct, take_profit_pct, 0.5, min_order_size_btc, True)
 
-                if not is_liquidated:
-                    # 남겨둔 현금(cash)에 포지션 결과(증거금 + 손익 - 수수료)를 더함
-                    cash += (position_margin + pnl) - fee
-                # 청산 시에는 증거금을 모두 잃으므로, 남겨둔 현금(cash)만 남게 됨 (아무것도 더하지 않음)
-                
-                cash = min(cash, MAX_ASSET_VALUE)
-                position_status, position_margin, trades = 'none', 0, trades + 1
-
-        # --- 4-2. 포지션이 없을 경우: 진입 신호 확인 ---
-        if position_status == 'none' and cash > 0:
-            signal, entry_price_candidate = 'none', df['Open'].iloc[i]
-            if df['pct_change'].iloc[i-1] >= spike_pct: signal = 'long'
-            elif df['pct_change'].iloc[i-1] <= fall_pct: signal = 'short'
-
-            if signal != 'none' and entry_price_candidate > 0:
-                potential_margin = cash * 0.5
-                potential_position_size_btc = (potential_margin * leverage) / entry_price_candidate
-                
-                if potential_position_size_btc >= min_order_size_btc:
-                    position_margin = potential_margin
-                    cash -= position_margin
-                    entry_price, position_status, trades = entry_price_candidate, signal, trades + 1
-                    
-                    if signal == 'long':
-                        take_profit_price = entry_price * (1 + take_profit_pct / 100)
-                        stop_loss_price = entry_price * (1 + stop_loss_pct / 100)
-                        if leverage > 1: liquidation_price = entry_price * (1 - 1/leverage)
-                    elif signal == 'short':
-                        take_profit_price = entry_price * (1 - take_profit_pct / 100)
-                        stop_loss_price = entry_price * (1 - stop_loss_pct / 100)
-                        if leverage > 1: liquidation_price = entry_price * (1 + 1/leverage)
-        
-        # --- 4-3. 현재 자산 평가 및 기록 ---
-        current_asset = cash
-        if position_status != 'none':
-            current_asset += _calculate_asset(entry_price, current_price, position_margin, leverage, position_status, 0)
-        asset_history.append(current_asset)
-
-    # 5. 최종 결과 계산 및 반환
-    final_asset = asset_history[-1] if asset_history else initial_cash
+    # 4. 최종 결과 계산 및 반환
+    final_asset = asset_history[-1] if len(asset_history) else initial_cash
     total_return = (final_asset / initial_cash - 1) * 100
-    asset_series = pd.Series(asset_history)
-    mdd = (1 - (asset_series / asset_series.cummax())).max() * 100 if not asset_series.empty else 0
-    return {'total_return_pct': total_return, 'mdd_pct': -mdd, 'total_trades': trades, 'total_liquidations': liquidations, 'asset_history': asset_history}
\ No newline at end of file
+    mdd = max_drawdown * 100
+    return {'total_return_pct': total_return, 'mdd_pct': -mdd, 'total_trades': trades, 'total_liquidations': liquidations, 'asset_history': asset_history}
+
+def momentum_spike_scalping_long_short_realistic_batch(param_list, df, initial_cash, fee_rate, leverage):
+    """
+    momentum_spike_scalping_long_short_realistic를 여러 파라미터 조합으로 한 번에 실행합니다. (파라미터 탐색용)
+    - 조합별 (급등 기준, 익절, 손절, 최소 주문량)을 배열로 만들어 커널 하나에서 모두 실행하고, 자산 기록은 저장하지 않습니다.
+    - 결과는 지표별 배열(param_list 순서) 딕셔너리이며, 값은 조합마다 momentum_spike_scalping_long_short_realistic를 실행한 것과 같습니다.
+    """
+    grid = np.empty((len(param_list), 4))
+    for k, params in enumerate(param_list):
+        try:
+            grid[k] = (float(params.get('spike_pct', 3.0)), float(params.get('take_profit_pct', 1.0)),
+                       float(params.get('stop_loss_pct', -1.0)), float(params.get('min_order_size_btc', 0.001)))
+        except (ValueError, TypeError):
+            grid[k] = (3.0, 1.0, -1.0, 0.001)
+    if df.empty:
+        zeros = np.zeros(len(param_list))
+        return {'total_return_pct': zeros, 'mdd_pct': zeros.copy(), 'total_trades': zeros.astype(np.int64), 'total_liquidations': zeros.astype(np.int64)}
+    open_prices, close, low, high = (df[col].to_numpy(dtype=np.float64) for col in ('Open', 'Close', 'Low', 'High'))
+    final_assets, mdds, trades, liquidations = _momentum_spike_batch(
+        open_prices, close, low, high, grid, float(initial_cash), float(fee_rate), float(leverage), 0.5, True)
+    return {'total_return_pct': (final_assets / initial_cash - 1) * 100, 'mdd_pct': -mdds, 'total_trades': trades, 'total_liquidations': liquidations}
@@ -198,8 +198,8 @@ class RollingWindowWorker(QThread):
 
 class FullPeriodWorker(QThread):
     """전체 기간 테스트용 Worker 수정"""
-    # ⭐ plot_update 시그널 추가
-    plot_update = pyqtSignal(object, float, float)
+    # ⭐ plot_update 시그널 추가 (날짜별 시각/전략 자산/시장 자산 배열을 한 번에 전달)
+    plot_update = pyqtSignal(object, object, object)
     finished = pyqtSignal(object, dict)
 
     def __init__(self, sf, sp, lev, rp, sd):
@@ -378,11 +378,10 @@ class MainWindow(QMainWindow):
         # ⭐ 그래프 데이터를 저장할 리스트 초기화
         self.x_data, self.y_strategy, self.y_market = [], [], []
     
-    def update_full_period_plot(self, timestamp, strategy_balance, market_balance):
-        """⭐ 전체 기간 그래프를 실시간으로 업데이트하는 새 함수"""
-        self.x_data.append(timestamp.timestamp())
-        self.y_strategy.append(strategy_balance)
-        self.y_market.append(market_balance)
+    def update_full_period_plot(self, timestamps, strategy_balances, market_balances):
+        """⭐ 전체 기간 그래프를 한 번에 그리는 함수 (점마다 다시 그리지 않음)"""
+        self.x_data = timestamps.astype('int64') / 10**9
+        self.y_strategy, self.y_market = strategy_balances, market_balances
         self.strategy_line.setData(self.x_data, self.y_strategy)
         self.market_line.setData(self.x_data, self.y_market)
     
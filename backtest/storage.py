@@ -0,0 +1,120 @@
+# storage.py
+
+import numpy as np
+import os
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+OHLCV_AGG = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+# 미리 리샘플링해서 저장해 두는 시간봉 (pandas 주기 문자열 -> 파일 이름 접미사)
+RESAMPLED_PERIODS = {'h': '1h', '4h': '4h', 'D': '1d'}
+_PARQUET_OPTIONS = ds.ParquetFileFormat().make_write_options(compression='zstd')
+
+
+def parquet_path(csv_path):
+    """CSV 파일과 나란히 저장되는 Parquet 데이터셋 경로 (예: backtest/data.parquet)"""
+    return os.path.splitext(csv_path)[0] + '.parquet'
+
+def resampled_path(csv_path, resample_period):
+    """미리 리샘플링된 데이터 파일 경로 (예: backtest/data_1h.parquet), 저장 대상 시간봉이 아니면 None"""
+    try:
+        suffix = RESAMPLED_PERIODS.get(pd.tseries.frequencies.to_offset(resample_period).freqstr)
+    except ValueError:
+        return None
+    return f"{os.path.splitext(csv_path)[0]}_{suffix}.parquet" if suffix else None
+
+def resample_ohlcv(df, resample_period):
+    """1분봉을 지정한 시간봉으로 리샘플링 (거래 기록이 없는 빈 구간은 제외)"""
+    out = df.resample(resample_period).agg(OHLCV_AGG)
+    # 빈 구간은 가격이 전부 NaN이므로 Close 한 컬럼만 보고 걸러냄 (dropna()처럼 5개 컬럼을 모두 검사하지 않음)
+    # 거래량 0 여부로 거르면 실제 거래량이 0인 봉까지 빠지므로 사용하지 않음
+    return out[~np.isnan(out['Close'].to_numpy())]
+
+def _month_key(open_time):
+    return (open_time.dt.year * 100 + open_time.dt.month).astype('int32')
+
+def _latest_mtime(path):
+    """Parquet 데이터셋(디렉터리) 안에서 가장 최근에 수정된 파일의 시각"""
+    latest = os.path.getmtime(path)
+    for root, _, files in os.walk(path):
+        for name in files:
+            latest = max(latest, os.path.getmtime(os.path.join(root, name)))
+    return latest
+
+def write_parquet(df, csv_path):
+    """
+    1분봉 데이터를 월별로 파티션된 Parquet 데이터셋에 저장합니다.
+    - df에 포함된 달의 파티션만 다시 쓰므로, 이어쓰기 시 전체 파일을 다시 쓰지 않습니다.
+    """
+    path = parquet_path(csv_path)
+    df = df[['Open time'] + OHLCV_COLUMNS].copy()
+    df['month'] = _month_key(df['Open time'])
+
+    if os.path.isdir(path):
+        # 기존 파티션과 겹치는 달은 기존 데이터와 합쳐서 다시 씀
+        existing = ds.dataset(path, format='parquet', partitioning='hive')
+        months = pa.array(df['month'].unique(), type=pa.int32())
+        old_df = existing.to_table(filter=ds.field('month').isin(months)).to_pandas()
+        if not old_df.empty:
+            df = pd.concat([old_df[df.columns], df], ignore_index=True)
+
+    df = df.drop_duplicates(subset=['Open time'], keep='last').sort_values('Open time')
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    ds.write_dataset(
+        table, path, format='parquet', file_options=_PARQUET_OPTIONS,
+        partitioning=ds.partitioning(pa.schema([('month', pa.int32())]), flavor='hive'),
+        existing_data_behavior='delete_matching'
+    )
+
+def read_csv(csv_path):
+    """1분봉 CSV를 pyarrow 엔진으로 빠르게 읽음 ('Open time'은 UTC 시각 컬럼)"""
+    # 가격은 float64 유지 (float32로 줄이면 가격이 반올림되어 교차 신호/수익률이 달라짐)
+    df = pd.read_csv(csv_path, engine='pyarrow', dtype={col: 'float64' for col in OHLCV_COLUMNS})
+    df['Open time'] = pd.to_datetime(df['Open time'], utc=True).dt.as_unit('ns')
+    return df
+
+def read_minute_bars(csv_path):
+    """1분봉 데이터를 읽어옴 (최신 Parquet 데이터셋이 있으면 CSV 대신 사용)"""
+    path = parquet_path(csv_path)
+    if os.path.isdir(path) and _latest_mtime(path) >= os.path.getmtime(csv_path):
+        df = pd.read_parquet(path, columns=['Open time'] + OHLCV_COLUMNS).set_index('Open time')
+        if not df.index.is_monotonic_increasing: df = df.sort_index()
+        return df
+    return read_csv(csv_path).set_index('Open time')
+
+def _read_parquet_since(csv_path, since):
+    """Parquet 데이터셋에서 since 이후의 1분봉만 읽음 (해당 달 이후의 파티션만 읽음)"""
+    dataset = ds.dataset(parquet_path(csv_path), format='parquet', partitioning='hive')
+    since = pd.Timestamp(since).tz_convert('UTC')
+    row_filter = (ds.field('month') >= since.year * 100 + since.month) & \
+                 (ds.field('Open time') >= pa.scalar(since.as_unit('ns').value, type=pa.timestamp('ns', tz='UTC')))
+    df = dataset.to_table(columns=['Open time'] + OHLCV_COLUMNS, filter=row_filter).to_pandas().set_index('Open time')
+    return df if df.index.is_monotonic_increasing else df.sort_index()
+
+def update_resampled(csv_path, since=None):
+    """
+    자주 쓰는 시간봉(1시간/4시간/1일)을 미리 리샘플링해 Parquet 파일로 저장합니다.
+    - 파일이 없는 시간봉은 전체 데이터로 새로 만듭니다.
+    - since가 주어지면 since가 속한 봉부터 다시 계산해서 기존 파일 뒷부분만 교체합니다.
+    """
+    minute_df = None
+    for resample_period in RESAMPLED_PERIODS:
+        path = resampled_path(csv_path, resample_period)
+        if not os.path.exists(path):
+            if minute_df is None: minute_df = read_minute_bars(csv_path)
+            resample_ohlcv(minute_df, resample_period).to_parquet(path)
+        elif since is not None:
+            # 마지막 봉은 일부만 채워져 있었을 수 있으므로 since가 속한 봉의 시작부터 다시 계산
+            bucket_start = pd.Timestamp(since).floor(resample_period)
+            tail = resample_ohlcv(_read_parquet_since(csv_path, bucket_start), resample_period)
+            old = pd.read_parquet(path)
+            pd.concat([old[old.index < bucket_start], tail]).to_parquet(path)
+
+def read_resampled(csv_path, resample_period):
+    """미리 리샘플링된 데이터가 있고 CSV보다 최신이면 반환, 아니면 None"""
+    path = resampled_path(csv_path, resample_period)
+    if path and os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(csv_path):
+        return pd.read_parquet(path)
+    return None